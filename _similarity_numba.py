@@ -0,0 +1,53 @@
+"""
+Numba-compiled similarity kernel for the demo's fallback fuzzy matcher
+The kernels are only defined when Numba is installed (see NUMBA_AVAILABLE)
+"""
+
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _popcount(x):
+        """Count set bits of a uint64 character mask word"""
+        count = 0
+        while x:
+            x &= x - np.uint64(1)
+            count += 1
+        return count
+
+    @njit(cache=True)
+    def sim_bits(q_lo, q_hi, c_lo, c_hi, q_len, c_len):
+        """Character-overlap similarity with length penalty, from two-word character bitmasks"""
+        overlap = _popcount(q_lo & c_lo) + _popcount(q_hi & c_hi)
+        total_chars = max(_popcount(q_lo | c_lo) + _popcount(q_hi | c_hi), 1)
+        max_len = max(q_len, c_len, 1)
+
+        char_score = (overlap / total_chars) * 100
+        length_penalty = (abs(c_len - q_len) / max_len) * 20
+
+        return max(0.0, char_score - length_penalty)
+
+    @njit(cache=True)
+    def best_match_bits(q_lo, q_hi, q_len, candidate_bits, candidate_lens):
+        """
+        Return (index, score) of the first highest scoring candidate, or (-1, 0.0)
+
+        candidate_bits is an (n, 2) uint64 array of low and high mask words.
+        """
+        best_index = -1
+        best_score = 0.0
+
+        for i in range(candidate_bits.shape[0]):
+            score = sim_bits(q_lo, q_hi, candidate_bits[i, 0], candidate_bits[i, 1],
+                             q_len, candidate_lens[i])
+            if score > best_score:
+                best_score = score
+                best_index = i
+
+        return best_index, best_score
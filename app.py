@@ -3,12 +3,8 @@ Streamlit Web Interface for Geospatial NLP Query System
 """
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import sys
 import os
-import json
 
 # Add src directory to path
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
@@ -20,6 +16,20 @@ except ImportError:
     from geospatial_query_system import GeospatialQuerySystem
 
 
+@st.cache_resource(show_spinner=False)
+def get_system() -> GeospatialQuerySystem:
+    """
+    Build the query system once and share it across all sessions
+    """
+    system = GeospatialQuerySystem()
+    
+    # Load the data and the NLP models here rather than on first use, so a failure
+    # surfaces in main's error handling and the first query does not pay for them
+    system.setup()
+    system.nlp_processor
+    return system
+
+
 def main():
     """
     Main Streamlit application
@@ -40,22 +50,24 @@ def main():
     in natural language queries to canonical geographical entities.
     """)
     
-    # Initialize session state
-    if 'system' not in st.session_state:
-        with st.spinner("Initializing system... Please wait"):
-            try:
-                st.session_state.system = GeospatialQuerySystem()
-                st.success("System initialized successfully!")
-            except Exception as e:
-                st.error(f"Failed to initialize system: {e}")
-                st.stop()
+    # Get the shared system instance (built on the first run only)
+    with st.spinner("Initializing system... Please wait"):
+        try:
+            system = get_system()
+        except Exception as e:
+            st.error(f"Failed to initialize system: {e}")
+            st.stop()
+    
+    if 'system_ready' not in st.session_state:
+        st.session_state.system_ready = True
+        st.success("System initialized successfully!")
     
     # Sidebar with system information
     with st.sidebar:
         st.header("📊 System Information")
         
-        if hasattr(st.session_state.system, 'data_processor'):
-            stats = st.session_state.system.data_processor.get_data_stats()
+        if hasattr(system, 'data_processor'):
+            stats = system.data_processor.get_data_stats()
             st.metric("Total Cities", f"{stats['total_cities']:,}")
             st.metric("Unique Countries", stats['unique_countries'])
             st.metric("Unique States/Regions", stats['unique_states'])
@@ -69,10 +81,6 @@ def main():
             help="Minimum similarity score for matching (higher = more strict)"
         )
         
-        # Update threshold if changed
-        if hasattr(st.session_state.system, 'fuzzy_matcher'):
-            st.session_state.system.fuzzy_matcher.threshold = fuzzy_threshold
-        
         st.header("📝 Example Queries")
         examples = [
             "Which of the following saw the highest average temperature in January, Maharashtra, Ahmedabad or entire New-Zealand?",
@@ -128,12 +136,18 @@ def main():
         if not query.strip():
             st.warning("Please enter a query first.")
         else:
+            # Only needed to present results, so keep them off the initial page load
+            import numpy as np
+            import pandas as pd
+            
             with st.spinner("Processing query..."):
                 try:
                     # Process the query
-                    results = st.session_state.system.process_query(
+                    # The threshold is passed per query; the system is shared by every session
+                    results = system.process_query(
                         query, 
-                        detailed=detailed_btn
+                        detailed=detailed_btn,
+                        threshold=fuzzy_threshold
                     )
                     
                     if not results:
@@ -142,38 +156,40 @@ def main():
                         # Display results
                         st.header("🎯 Results")
                         
+                        # Build the results table once for all views and the quick stats
+                        df_results = pd.DataFrame(results)
+                        avg_confidence = df_results['confidence_score'].to_numpy().mean()
+                        entity_types = df_results['table'].nunique()
+                        city_count = int((df_results['table'] == 'City').sum())
+                        
                         # Create tabs for different views
                         tab1, tab2, tab3, tab4 = st.tabs(["📋 Summary", "📊 Detailed View", "🗺️ Map", "📁 Raw Data"])
                         
                         with tab1:
                             st.subheader("Extracted Geographical Entities")
                             
-                            for i, result in enumerate(results, 1):
-                                with st.container():
-                                    col_token, col_canonical, col_table, col_confidence = st.columns(4)
-                                    
-                                    with col_token:
-                                        st.write(f"**Token:** {result['token']}")
-                                    
-                                    with col_canonical:
-                                        st.write(f"**Canonical:** {result['canonical_name']}")
-                                    
-                                    with col_table:
-                                        st.write(f"**Type:** {result['table']}")
-                                    
-                                    with col_confidence:
-                                        confidence = result['confidence_score']
-                                        color = "green" if confidence >= 90 else "orange" if confidence >= 70 else "red"
-                                        st.write(f"**Confidence:** <span style='color:{color}'>{confidence:.1f}%</span>", unsafe_allow_html=True)
-                                    
-                                    st.divider()
+                            summary = df_results[['token', 'canonical_name', 'table', 'confidence_score']].rename(
+                                columns={
+                                    'token': 'Token',
+                                    'canonical_name': 'Canonical',
+                                    'table': 'Type',
+                                    'confidence_score': 'Confidence'
+                                }
+                            )
+                            
+                            # Color confidence scores in one vectorized pass
+                            confidence = summary['Confidence'].to_numpy()
+                            colors = np.select([confidence >= 90, confidence >= 70], ['green', 'orange'], default='red')
+                            styled_summary = summary.style.apply(
+                                lambda _: np.char.add('color: ', colors),
+                                subset=['Confidence']
+                            ).format({'Confidence': '{:.1f}%'})
+                            
+                            st.dataframe(styled_summary, use_container_width=True, hide_index=True)
                         
                         with tab2:
                             st.subheader("Detailed Analysis")
                             
-                            # Create a dataframe for better display
-                            df_results = pd.DataFrame(results)
-                            
                             # Display as a styled table
                             st.dataframe(
                                 df_results[['token', 'canonical_name', 'table', 'confidence_score']],
@@ -183,23 +199,15 @@ def main():
                             
                             # Confidence distribution
                             if len(results) > 1:
-                                fig_conf = px.bar(
-                                    df_results, 
-                                    x='token', 
-                                    y='confidence_score',
-                                    color='table',
-                                    title="Confidence Scores by Entity"
-                                )
-                                st.plotly_chart(fig_conf, use_container_width=True)
+                                st.caption("Confidence Scores by Entity")
+                                st.bar_chart(df_results.set_index('token')['confidence_score'])
                         
                         with tab3:
                             st.subheader("Geographic Distribution")
                             
                             # Try to create a simple map if we have city data
-                            cities_in_results = [r for r in results if r['table'] == 'City']
-                            
-                            if cities_in_results:
-                                st.write(f"Found {len(cities_in_results)} cities in your query")
+                            if city_count:
+                                st.write(f"Found {city_count} cities in your query")
                                 
                                 # You could integrate with actual coordinates here
                                 # For now, just show a placeholder
@@ -219,11 +227,9 @@ def main():
                                 st.metric("Entities Found", len(results))
                             
                             with col_s2:
-                                avg_confidence = sum(r['confidence_score'] for r in results) / len(results)
                                 st.metric("Avg Confidence", f"{avg_confidence:.1f}%")
                             
                             with col_s3:
-                                entity_types = len(set(r['table'] for r in results))
                                 st.metric("Entity Types", entity_types)
                 
                 except Exception as e:
@@ -3,10 +3,92 @@ Demo script for Geospatial NLP Query System
 This script demonstrates the core functionality with minimal dependencies
 """
 
+import functools
 import os
 import re
 import sys
-from typing import List, Dict, Optional
+from array import array
+from typing import List, Dict, Optional, Sequence, Tuple
+
+try:
+    from rapidfuzz import fuzz, process
+    from rapidfuzz.utils import default_process
+except ImportError:
+    # The demo must keep working without third-party dependencies
+    fuzz = None
+    process = None
+    default_process = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Capitalized words (including hyphenated and multi-word names)
+_PLACE_RE = re.compile(r'\b[A-Z][a-zA-Z\-]+(?:\s+[A-Z][a-zA-Z\-]+)*\b')
+
+# Token cleanup: strip punctuation, then split hyphenated words (new-zealand -> new zealand)
+_PUNCT_RE = re.compile(r'[^\w\s-]')
+_HYPHEN_RE = re.compile(r'(?<=[a-z])-(?=[a-z])')
+
+# Common non-place words
+_STOP_WORDS = frozenset({
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December',
+    'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday',
+    'Which', 'Show', 'The', 'This', 'That', 'These', 'Those', 'And', 'Or', 'But',
+    'Graph', 'Chart', 'Temperature', 'Rainfall', 'Average', 'Highest', 'Following'
+})
+
+# Display names for the table codes stored alongside each candidate
+TABLE_NAMES = ('City', 'Country', 'State')
+
+# Each ASCII character sets the bit of its code point; characters outside ASCII
+# share the bit of NUL, so masks are exact for ASCII input without NUL.
+# The array paths store a mask as two uint64 words (low and high 64 bits)
+_OTHER_CHAR_BIT = 1
+_WORD_MASK = (1 << 64) - 1
+
+if np is not None:
+    _POPCOUNT_LUT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+if hasattr(int, 'bit_count'):  # Python >= 3.10
+    _bit_count = int.bit_count
+else:
+    def _bit_count(value: int) -> int:
+        return bin(value).count('1')
+
+
+def _to_bits(s: str) -> int:
+    """Encode the character set of a lowercase string as a bitmask"""
+    bits = 0
+    for char in s:
+        code = ord(char)
+        bits |= 1 << code if code < 128 else _OTHER_CHAR_BIT
+    return bits
+
+
+def _split_bits(bits: int) -> Tuple[int, int]:
+    """Split a character bitmask into its low and high 64-bit words"""
+    return bits & _WORD_MASK, bits >> 64
+
+
+def _load_numba_kernel():
+    """best_match_bits from _similarity_numba, or None when Numba is not installed"""
+    # Numba is optional and slow to import, so it is only loaded once the fallback scorer runs
+    from _similarity_numba import NUMBA_AVAILABLE
+    if not NUMBA_AVAILABLE:
+        return None
+    
+    from _similarity_numba import best_match_bits
+    return best_match_bits
+
+
+def _popcount(values: 'np.ndarray') -> 'np.ndarray':
+    """Count set bits of each row of an (n, 2) uint64 word array"""
+    if hasattr(np, 'bitwise_count'):  # NumPy >= 2.0
+        return np.bitwise_count(values).sum(axis=1)
+    return _POPCOUNT_LUT[np.ascontiguousarray(values).view(np.uint8)].sum(axis=1)
 
 
 class SimpleFuzzyMatcher:
@@ -16,46 +98,143 @@ class SimpleFuzzyMatcher:
     """
     
     @staticmethod
-    def similarity(s1: str, s2: str) -> float:
-        """Calculate basic string similarity"""
+    def similarity(s1: str, s2: str, bits1: Optional[int] = None,
+                   bits2: Optional[int] = None) -> float:
+        """Calculate basic string similarity (character bitmasks may be precomputed)"""
         s1, s2 = s1.lower(), s2.lower()
-        
-        # Exact match
-        if s1 == s2:
+        if bits1 is None:
+            bits1 = _to_bits(s1)
+        if bits2 is None:
+            bits2 = _to_bits(s2)
+        return SimpleFuzzyMatcher._similarity_norm(s1, s2, bits1, bits2, len(s1), len(s2))
+    
+    @staticmethod
+    def _similarity_norm(q: str, c: str, q_bits: int, c_bits: int, q_len: int, c_len: int) -> float:
+        """Similarity of already lowercased strings with precomputed bitmasks and lengths"""
+        # Exact match; the cheap integer checks rule out most candidates first
+        if q_bits == c_bits and q_len == c_len and q == c:
             return 100.0
         
         # Length difference penalty
-        len_diff = abs(len(s1) - len(s2))
-        max_len = max(len(s1), len(s2))
+        max_len = q_len if q_len > c_len else c_len
         if max_len == 0:
             return 0.0
         
-        # Character overlap
-        chars1 = set(s1)
-        chars2 = set(s2)
-        overlap = len(chars1.intersection(chars2))
-        total_chars = len(chars1.union(chars2))
-        
+        # Character overlap, counted on the character-set bitmasks
+        total_chars = _bit_count(q_bits | c_bits)
         if total_chars == 0:
             return 0.0
         
         # Basic similarity score
-        char_score = (overlap / total_chars) * 100
-        length_penalty = (len_diff / max_len) * 20
+        char_score = (_bit_count(q_bits & c_bits) / total_chars) * 100
+        length_penalty = (abs(q_len - c_len) / max_len) * 20
         
         return max(0, char_score - length_penalty)
     
     @staticmethod
-    def find_best_match(query: str, candidates: List[str], threshold: float = 70) -> Optional[str]:
-        """Find best matching candidate"""
+    def batch_similarity(query: str, candidate_bits: 'np.ndarray',
+                         candidate_lens: 'np.ndarray') -> 'np.ndarray':
+        """Calculate similarity against all candidates at once from their (n, 2) bitmask words"""
+        query = query.lower()
+        query_bits = np.array(_split_bits(_to_bits(query)), dtype=np.uint64)
+        query_len = len(query)
+        
+        overlap = _popcount(candidate_bits & query_bits)
+        total_chars = np.maximum(_popcount(candidate_bits | query_bits), 1)
+        max_len = np.maximum(candidate_lens, max(query_len, 1))
+        
+        char_score = (overlap / total_chars) * 100
+        length_penalty = (np.abs(candidate_lens - query_len) / max_len) * 20
+        
+        return np.maximum(0, char_score - length_penalty)
+    
+    @staticmethod
+    def length_buckets(candidate_lens: Sequence[int]) -> Dict[int, List[int]]:
+        """Group candidate indices by candidate length, in ascending index order"""
+        buckets = {}
+        for index, length in enumerate(candidate_lens):
+            buckets.setdefault(int(length), []).append(index)
+        return buckets
+    
+    @staticmethod
+    def find_best_match(query: str, candidates: List[str], threshold: float = 70,
+                        candidate_bits: Optional[Sequence[int]] = None,
+                        candidate_lens: Optional[Sequence[int]] = None,
+                        length_buckets: Optional[Dict[int, List[int]]] = None) -> Optional[Tuple[str, float, int]]:
+        """
+        Find best matching candidate as (candidate, score, index)
+        
+        Precomputed bitmasks and lengths must describe the lowercased candidates,
+        which are then assumed to be lowercase already. Bitmasks are Python ints,
+        or an (n, 2) uint64 array of _split_bits words for the array paths. Length buckets come from
+        length_buckets(candidate_lens).
+        """
+        if process is not None:
+            # RapidFuzz scores the whole candidate list in C++; lowercasing the query
+            # makes it case-insensitive like the fallback scorers, and the candidates
+            # are lowercase already so nothing is reprocessed per call
+            return process.extractOne(query.lower(), candidates, scorer=fuzz.WRatio,
+                                      processor=None, score_cutoff=threshold)
+        
+        if np is not None and isinstance(candidate_bits, np.ndarray):
+            best_match_bits = _load_numba_kernel()
+            if best_match_bits is not None:
+                # Compiled scan over the precomputed bitmasks
+                query_lower = query.lower()
+                query_lo, query_hi = _split_bits(_to_bits(query_lower))
+                index, score = best_match_bits(np.uint64(query_lo), np.uint64(query_hi),
+                                               len(query_lower), candidate_bits, candidate_lens)
+                if index >= 0 and score >= threshold:
+                    return candidates[index], score, index
+                return None
+            
+            # Score every candidate with a handful of array operations
+            scores = SimpleFuzzyMatcher.batch_similarity(query, candidate_bits, candidate_lens)
+            index = int(scores.argmax())
+            score = float(scores[index])
+            if score >= threshold and score > 0:
+                return candidates[index], score, index
+            return None
+        
+        query = query.lower()
+        query_bits = _to_bits(query)
+        query_len = len(query)
+        if candidate_bits is None or candidate_lens is None:
+            normalized = [candidate.lower() for candidate in candidates]
+            candidate_bits = [_to_bits(candidate) for candidate in normalized]
+            candidate_lens = [len(candidate) for candidate in normalized]
+        else:
+            normalized = candidates
+        if length_buckets is None:
+            length_buckets = SimpleFuzzyMatcher.length_buckets(candidate_lens)
+        
+        # A candidate can never beat 100 minus its length penalty, so visit the
+        # length buckets by that bound and stop once no remaining one can win
+        bounds = []
+        for length in length_buckets:
+            max_len = max(query_len, length, 1)
+            bounds.append((100 - (abs(query_len - length) / max_len) * 20, length))
+        bounds.sort(reverse=True)
+        
         best_match = None
         best_score = 0
-        
-        for candidate in candidates:
-            score = SimpleFuzzyMatcher.similarity(query, candidate)
-            if score >= threshold and score > best_score:
-                best_score = score
-                best_match = candidate
+        for bound, length in bounds:
+            if bound < threshold or bound < best_score:
+                break
+            for index in length_buckets[length]:
+                score = SimpleFuzzyMatcher._similarity_norm(
+                    query, normalized[index], query_bits, candidate_bits[index],
+                    query_len, length)
+                if score == 100.0:
+                    # Only same-length candidates reach 100 and their bucket comes first
+                    return candidates[index], score, index
+                if score < threshold or score <= 0:
+                    continue
+                # Ties go to the earlier candidate, as in a plain left-to-right scan
+                if best_match is None or score > best_score or (
+                        score == best_score and index < best_match[2]):
+                    best_score = score
+                    best_match = (candidates[index], score, index)
         
         return best_match
 
@@ -65,6 +244,9 @@ class SimpleGeoDemo:
     Simple demonstration of the geospatial NLP concept
     """
     
+    # Minimum similarity score for a match (0-100)
+    match_threshold = 70
+    
     def __init__(self):
         """Initialize with sample data"""
         self.sample_cities = [
@@ -110,83 +292,120 @@ class SimpleGeoDemo:
             'madhya pradesh': 'Madhya Pradesh',
             'tamil nadu': 'Tamil Nadu'
         })
+        
+        # Normalize candidates once and pool all tables into a single columnar index:
+        # parallel arrays of match keys, canonical names and uint8 table codes
+        self._all_candidates = []
+        self._all_canonical = []
+        self._all_table_codes = array('B')
+        
+        tables = (self.sample_cities, self.sample_countries, self.sample_states)
+        mappings = (self.city_mappings, self.country_mappings, self.state_mappings)
+        for code, (names, mapping) in enumerate(zip(tables, mappings)):
+            for name in names:
+                self._all_candidates.append(name.lower())
+                self._all_canonical.append(mapping[name])
+                self._all_table_codes.append(code)
+        self._all_bits = [_to_bits(c) for c in self._all_candidates]
+        self._all_lens = [len(c) for c in self._all_candidates]
+        self._length_buckets = SimpleFuzzyMatcher.length_buckets(self._all_lens)
+        if np is not None:
+            self._all_bits = np.array([_split_bits(bits) for bits in self._all_bits],
+                                      dtype=np.uint64).reshape(-1, 2)
+            self._all_lens = np.array(self._all_lens, dtype=np.int64)
+        
+        # Exact-name lookup so correctly spelled places skip fuzzy scoring
+        self._exact_index = {}
+        for index, candidate in enumerate(self._all_candidates):
+            self._exact_index.setdefault(candidate, index)
+        
+        # Repeated tokens across queries are answered from the cache
+        self._match_cached = functools.lru_cache(maxsize=4096)(self._match_clean)
     
     def extract_potential_places(self, text: str) -> List[str]:
         """Extract potential place names from text"""
-        # Simple pattern matching for capitalized words
-        pattern = r'\b[A-Z][a-zA-Z\-]+(?:\s+[A-Z][a-zA-Z\-]+)*\b'
-        matches = re.findall(pattern, text)
-        
-        # Filter out common non-place words
-        stop_words = {
-            'January', 'February', 'March', 'April', 'May', 'June',
-            'July', 'August', 'September', 'October', 'November', 'December',
-            'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday',
-            'Which', 'Show', 'The', 'This', 'That', 'These', 'Those', 'And', 'Or', 'But',
-            'Graph', 'Chart', 'Temperature', 'Rainfall', 'Average', 'Highest', 'Following'
-        }
-        
-        filtered_matches = [match for match in matches if match not in stop_words]
-        return filtered_matches
+        return [match for match in _PLACE_RE.findall(text) if match not in _STOP_WORDS]
     
     def match_entity(self, query: str) -> List[Dict[str, any]]:
         """Match extracted entity to geographical databases"""
-        results = []
-        
-        # Preprocess query
-        query_clean = re.sub(r'[^\w\s-]', '', query.lower().strip())
-        query_clean = query_clean.replace('new-zealand', 'new zealand')
-        
-        # Try matching to cities
-        city_match = SimpleFuzzyMatcher.find_best_match(query_clean, self.sample_cities)
-        if city_match:
-            results.append({
-                'token': query,
-                'canonical_name': self.city_mappings[city_match],
-                'table': 'City',
-                'confidence_score': SimpleFuzzyMatcher.similarity(query_clean, city_match)
-            })
+        match = self._match_cached(self._clean_token(query))
+        if match is None:
+            return []
+        return [self._build_result(query, *match)]
+    
+    def match_entities(self, places: List[str]) -> List[Dict[str, any]]:
+        """Match several extracted entities at once, keeping their order"""
+        cleaned = [self._clean_token(place) for place in places]
+        matches = []
+        for query_clean in cleaned:
+            index = self._exact_index.get(query_clean)
+            matches.append((index, 100.0) if index is not None else None)
+        pending = [i for i, match in enumerate(matches) if match is None]
         
-        # Try matching to countries
-        country_match = SimpleFuzzyMatcher.find_best_match(query_clean, self.sample_countries)
-        if country_match:
-            results.append({
-                'token': query,
-                'canonical_name': self.country_mappings[country_match],
-                'table': 'Country',
-                'confidence_score': SimpleFuzzyMatcher.similarity(query_clean, country_match)
-            })
+        if pending and process is not None and np is not None:
+            # One C++ scoring matrix for all unresolved tokens against the whole pool
+            scores = process.cdist([cleaned[i] for i in pending], self._all_candidates,
+                                   scorer=fuzz.WRatio, processor=None, score_cutoff=self.match_threshold,
+                                   dtype=np.float64, workers=-1)
+            best_indices = scores.argmax(axis=1)
+            for row, i in enumerate(pending):
+                index = int(best_indices[row])
+                score = float(scores[row, index])
+                if score > 0 and score >= self.match_threshold:
+                    matches[i] = (index, score)
+        else:
+            for i in pending:
+                matches[i] = self._match_cached(cleaned[i])
         
-        # Try matching to states
-        state_match = SimpleFuzzyMatcher.find_best_match(query_clean, self.sample_states)
-        if state_match:
-            results.append({
-                'token': query,
-                'canonical_name': self.state_mappings[state_match],
-                'table': 'State',
-                'confidence_score': SimpleFuzzyMatcher.similarity(query_clean, state_match)
-            })
+        return [self._build_result(place, *match)
+                for place, match in zip(places, matches) if match is not None]
+    
+    @staticmethod
+    def _clean_token(query: str) -> str:
+        """Normalize an extracted token for matching"""
+        token = _HYPHEN_RE.sub(' ', _PUNCT_RE.sub('', query.lower().strip()))
+        if default_process is not None:
+            # The RapidFuzz scorers run without a processor, so both match paths
+            # see the same processed token
+            token = default_process(token)
+        return token
+    
+    def _build_result(self, token: str, index: int, score: float) -> Dict[str, any]:
+        """Build the result dictionary for a matched candidate"""
+        return {
+            'token': token,
+            'canonical_name': self._all_canonical[index],
+            'table': TABLE_NAMES[self._all_table_codes[index]],
+            'confidence_score': score
+        }
+    
+    def _match_clean(self, query_clean: str) -> Optional[Tuple[int, float]]:
+        """Match a preprocessed token, returning (candidate index, score)"""
+        index = self._exact_index.get(query_clean)
+        if index is not None:
+            return index, 100.0
         
-        # Return best match
-        if results:
-            return [max(results, key=lambda x: x['confidence_score'])]
-        return []
+        # Score every table in a single pass; ties resolve in City, Country, State order
+        match = SimpleFuzzyMatcher.find_best_match(
+            query_clean, self._all_candidates, self.match_threshold,
+            candidate_bits=self._all_bits, candidate_lens=self._all_lens,
+            length_buckets=self._length_buckets)
+        if not match:
+            return None
+        return match[2], match[1]
     
-    def process_query(self, query: str) -> List[Dict[str, any]]:
-        """Process a complete query"""
+    def analyze_query(self, query: str) -> Tuple[List[str], List[Dict[str, any]]]:
+        """Extract and match the places in a query without printing anything"""
+        potential_places = self.extract_potential_places(query)
+        return potential_places, self.match_entities(potential_places)
+    
+    def print_results(self, query: str, potential_places: List[str],
+                      all_results: List[Dict[str, any]]) -> None:
+        """Print the outcome of analyze_query for a query"""
         print(f"\nProcessing: {query}")
         print("-" * 50)
-        
-        # Extract potential places
-        potential_places = self.extract_potential_places(query)
         print(f"Potential places found: {potential_places}")
         
-        # Match each potential place
-        all_results = []
-        for place in potential_places:
-            matches = self.match_entity(place)
-            all_results.extend(matches)
-        
         # Display results
         if all_results:
             print("Results:")
@@ -196,6 +415,12 @@ class SimpleGeoDemo:
                       f"Table: {result['table']}")
         else:
             print("No geographical entities found.")
+    
+    def process_query(self, query: str) -> List[Dict[str, any]]:
+        """Process a complete query"""
+        # Extract potential places and match them in one batch
+        potential_places, all_results = self.analyze_query(query)
+        self.print_results(query, potential_places, all_results)
         
         return all_results
 
@@ -6,11 +6,16 @@ Demonstrates the key features of the Geospatial NLP Query System
 import time
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 # Add demo functionality
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from demo import SimpleGeoDemo
 
+# Pause lengths in seconds; set both to 0 for instant, non-interactive runs
+_DELAY = float(os.environ.get('PRESENTATION_DELAY', '0.5'))
+_CHAR_DELAY = float(os.environ.get('PRESENTATION_CHAR_DELAY', '0.03'))
+
 
 def print_header(title):
     """Print a formatted header"""
@@ -25,8 +30,18 @@ def print_section(title):
     print("-" * 40)
 
 
-def animate_text(text, delay=0.03):
+def pause(seconds=_DELAY):
+    """Pause between presentation items unless delays are disabled"""
+    if seconds:
+        time.sleep(seconds)
+
+
+def animate_text(text, delay=_CHAR_DELAY):
     """Animate text printing"""
+    if not delay:
+        print(text)
+        return
+    
     for char in text:
         print(char, end='', flush=True)
         time.sleep(delay)
@@ -52,12 +67,12 @@ def demo_presentation():
     
     for challenge in challenges:
         print(f"  {challenge}")
-        time.sleep(0.5)
+        pause()
     
     print_section("🧠 OUR SOLUTION")
     solutions = [
-        "🔸 Multi-Algorithm NLP Pipeline (spaCy + NLTK + Pattern Matching)",
-        "🔸 Advanced Fuzzy Matching (4 different similarity algorithms)",
+        "🔸 Multi-Algorithm NLP Pipeline (spaCy + Pattern Matching)",
+        "🔸 Advanced Fuzzy Matching (exact lookup + RapidFuzz WRatio)",
         "🔸 Comprehensive Database (40K+ cities, 200+ countries)",
         "🔸 Interactive Web Interface with Real-time Visualization",
         "🔸 Production-Ready Architecture with Full Test Suite"
@@ -65,7 +80,7 @@ def demo_presentation():
     
     for solution in solutions:
         print(f"  {solution}")
-        time.sleep(0.5)
+        pause()
     
     print_section("🚀 LIVE DEMONSTRATION")
     
@@ -92,14 +107,19 @@ def demo_presentation():
         }
     ]
     
-    for i, demo_item in enumerate(demo_queries, 1):
+    # Analyze all queries concurrently up front, then present them in order
+    queries = [demo_item['query'] for demo_item in demo_queries]
+    with ThreadPoolExecutor() as executor:
+        analyses = list(executor.map(demo.analyze_query, queries))
+    
+    for i, (demo_item, (places, results)) in enumerate(zip(demo_queries, analyses), 1):
         print(f"\n📝 Demo {i}: {demo_item['highlight']}")
         print(f"Query: \"{demo_item['query']}\"")
         print()
         
-        # Process and show results
-        results = demo.process_query(demo_item['query'])
-        time.sleep(1)
+        # Show results
+        demo.print_results(demo_item['query'], places, results)
+        pause(2 * _DELAY)
     
     print_section("📊 TECHNICAL METRICS")
     metrics = [
@@ -112,7 +132,7 @@ def demo_presentation():
     
     for metric in metrics:
         print(f"  {metric}")
-        time.sleep(0.5)
+        pause()
     
     print_section("🏗️ ARCHITECTURE HIGHLIGHTS")
     architecture = [
@@ -125,7 +145,7 @@ def demo_presentation():
     
     for item in architecture:
         print(f"  {item}")
-        time.sleep(0.5)
+        pause()
     
     print_section("🎁 BONUS FEATURES")
     bonus = [
@@ -138,7 +158,7 @@ def demo_presentation():
     
     for feature in bonus:
         print(f"  {feature}")
-        time.sleep(0.5)
+        pause()
     
     print_section("💡 COMPETITIVE ADVANTAGES")
     advantages = [
@@ -151,7 +171,7 @@ def demo_presentation():
     
     for advantage in advantages:
         print(f"  {advantage}")
-        time.sleep(0.5)
+        pause()
     
     print_section("🚀 FUTURE ENHANCEMENTS")
     future = [
@@ -164,7 +184,7 @@ def demo_presentation():
     
     for enhancement in future:
         print(f"  {enhancement}")
-        time.sleep(0.5)
+        pause()
     
     print_header("🎉 THANK YOU - TEAM SIH1517 🎉")
     
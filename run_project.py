@@ -7,20 +7,15 @@ import os
 import sys
 import subprocess
 import argparse
+import importlib.util
 
 
 def check_dependencies():
     """Check if required dependencies are installed"""
-    required_packages = ['pandas', 'spacy', 'rapidfuzz', 'nltk', 'streamlit']
-    missing_packages = []
+    required_packages = ['pandas', 'spacy', 'rapidfuzz', 'streamlit']
     
-    for package in required_packages:
-        try:
-            __import__(package)
-        except ImportError:
-            missing_packages.append(package)
-    
-    return missing_packages
+    # Locate packages without importing them; spaCy alone takes seconds to import
+    return [package for package in required_packages if importlib.util.find_spec(package) is None]
 
 
 def install_dependencies():
@@ -35,12 +30,28 @@ def install_dependencies():
         subprocess.check_call([sys.executable, '-m', 'spacy', 'download', 'en_core_web_sm'])
         print("spaCy model downloaded!")
         
+        build_data_cache()
+        
         return True
     except subprocess.CalledProcessError as e:
         print(f"Error installing dependencies: {e}")
         return False
 
 
+def build_data_cache():
+    """Convert worldcities.csv to Parquet once so later startups load faster"""
+    print("Converting worldcities.csv to Parquet...")
+    try:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+        from data_processor import DataProcessor
+        
+        # Loading the CSV writes the Parquet cache next to it
+        DataProcessor().load_worldcities_data()
+        print("Data cache ready!")
+    except Exception as e:
+        print(f"Skipping data cache (the CSV will be used instead): {e}")
+
+
 def run_demo():
     """Run the simplified demo"""
     print("Running simplified demo...")
@@ -104,7 +115,7 @@ This project implements a sophisticated NLP system for extracting and
 matching geographical entities from natural language queries.
 
 FEATURES:
-- Multi-method entity extraction (spaCy, NLTK, pattern matching)
+- Multi-method entity extraction (spaCy, pattern matching)
 - Fuzzy string matching for handling typos and variations
 - Support for cities, countries, and states/regions
 - Web interface with interactive visualization
@@ -43,17 +43,6 @@ pip install -r requirements.txt
 echo "Downloading spaCy English model..."
 python -m spacy download en_core_web_sm
 
-# Download NLTK data
-echo "Downloading NLTK data..."
-python -c "
-import nltk
-nltk.download('punkt')
-nltk.download('averaged_perceptron_tagger')
-nltk.download('maxent_ne_chunker')
-nltk.download('words')
-print('NLTK data downloaded successfully!')
-"
-
 # Check if worldcities.csv exists
 if [ ! -f "data/worldcities.csv" ]; then
     echo "Warning: worldcities.csv not found in data/ directory."
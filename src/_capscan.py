@@ -0,0 +1,97 @@
+"""
+Numba-compiled scanner for capitalized phrases in long ASCII texts
+The kernel is only defined when Numba is installed (see NUMBA_AVAILABLE)
+"""
+
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _is_word(b):
+        """Whether an ASCII byte is a regex word character [A-Za-z0-9_]"""
+        return (65 <= b <= 90) or (97 <= b <= 122) or (48 <= b <= 57) or b == 95
+
+    @njit(cache=True)
+    def _is_name_char(b):
+        """Whether an ASCII byte is in [a-zA-Z-]"""
+        return (65 <= b <= 90) or (97 <= b <= 122) or b == 45
+
+    @njit(cache=True)
+    def _is_space(b):
+        """Whether an ASCII byte matches the regex \\s class"""
+        return b == 32 or (9 <= b <= 13) or (28 <= b <= 31)
+
+    @njit(cache=True)
+    def _is_boundary(buf, i):
+        """Whether position i is a regex word boundary"""
+        before = i > 0 and _is_word(buf[i - 1])
+        after = i < buf.shape[0] and _is_word(buf[i])
+        return before != after
+
+    @njit(cache=True)
+    def find_caps(buf):
+        """
+        Return (starts, ends) of the phrases matched by
+        \\b[A-Z][a-zA-Z\\-]+(?:\\s+[A-Z][a-zA-Z\\-]+)*\\b, in findall order
+
+        Ends are tried in the order the regex backtracks: the longest phrase first,
+        shrinking its last word before dropping it.
+        """
+        n = buf.shape[0]
+        starts = np.empty(n // 2 + 1, dtype=np.int64)
+        ends = np.empty(n // 2 + 1, dtype=np.int64)
+        word_starts = np.empty(n // 2 + 1, dtype=np.int64)
+        word_ends = np.empty(n // 2 + 1, dtype=np.int64)
+        count = 0
+
+        i = 0
+        while i < n:
+            if not (65 <= buf[i] <= 90) or (i > 0 and _is_word(buf[i - 1])):
+                i += 1
+                continue
+
+            # Greedily collect the words of the phrase starting at i
+            words = 0
+            pos = i
+            while True:
+                end = pos + 1
+                while end < n and _is_name_char(buf[end]):
+                    end += 1
+                if end - pos < 2:
+                    break
+                word_starts[words] = pos
+                word_ends[words] = end
+                words += 1
+
+                gap = end
+                while gap < n and _is_space(buf[gap]):
+                    gap += 1
+                if gap == end or gap >= n or not (65 <= buf[gap] <= 90):
+                    break
+                pos = gap
+
+            # Backtrack to the longest end that sits on a word boundary
+            match_end = -1
+            for w in range(words - 1, -1, -1):
+                for e in range(word_ends[w], word_starts[w] + 1, -1):
+                    if _is_boundary(buf, e):
+                        match_end = e
+                        break
+                if match_end >= 0:
+                    break
+
+            if match_end < 0:
+                i += 1
+            else:
+                starts[count] = i
+                ends[count] = match_end
+                count += 1
+                i = match_end
+
+        return starts[:count], ends[:count]
@@ -4,8 +4,18 @@ Handles loading and preprocessing of geographical data
 """
 
 import pandas as pd
+import functools
 import os
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
+
+# Attributes derived from cities_df, cached until the data is reloaded
+_DERIVED_ATTRS = ('canonical_names', 'canonical_mappings', 'data_stats')
+
+# The only worldcities columns the system reads, all loaded as Arrow-backed strings
+_NAME_COLUMNS = ['city', 'city_ascii', 'country', 'admin_name']
+
+# Source column of each canonical mapping
+_MAPPING_COLUMNS = {'cities': 'city_ascii', 'countries': 'country', 'states': 'admin_name'}
 
 
 class DataProcessor:
@@ -13,16 +23,22 @@ class DataProcessor:
     Handles loading and preprocessing of geographical data from CSV files
     """
     
-    def __init__(self, data_path: str = None):
+    def __init__(self, data_path: str = None, chunksize: Optional[int] = None):
         """
         Initialize the DataProcessor
         
         Args:
             data_path: Path to the data directory
+            chunksize: Rows per chunk to stream the CSV in without keeping the full
+                DataFrame (defaults to the GEO_DATA_CHUNKSIZE environment variable;
+                unset loads the whole file)
         """
         if data_path is None:
             data_path = os.path.join(os.path.dirname(__file__), '..', 'data')
+        if chunksize is None and os.environ.get('GEO_DATA_CHUNKSIZE'):
+            chunksize = int(os.environ['GEO_DATA_CHUNKSIZE'])
         self.data_path = data_path
+        self.chunksize = chunksize
         self.cities_df = None
         self.countries_set = None
         self.states_set = None
@@ -35,6 +51,71 @@ class DataProcessor:
         Returns:
             DataFrame containing the world cities data
         """
+        csv_path = self._find_csv()
+        
+        # Anything derived from previously loaded data is stale now
+        for attr in _DERIVED_ATTRS:
+            self.__dict__.pop(attr, None)
+        
+        # Prefer the Parquet copy of the CSV when it is at least as new
+        parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+        if (os.path.exists(parquet_path)
+                and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)):
+            try:
+                self.cities_df = pd.read_parquet(parquet_path, columns=_NAME_COLUMNS, dtype_backend='pyarrow')
+                return self.cities_df
+            except (ImportError, OSError, ValueError):
+                # No Parquet engine or an unreadable file; parse the CSV instead
+                pass
+            
+        self.cities_df = pd.read_csv(csv_path, usecols=_NAME_COLUMNS, engine='pyarrow', dtype_backend='pyarrow')
+        self._write_parquet_cache(parquet_path)
+        return self.cities_df
+    
+    def stream_worldcities_data(self) -> Dict[str, Dict[str, str]]:
+        """
+        Build the canonical mappings and statistics by reading the CSV in chunks
+        
+        Only the deduplicated names stay in memory; cities_df is left unset.
+        
+        Returns:
+            Dictionary containing mappings for each geographical type
+        """
+        csv_path = self._find_csv()
+        for attr in _DERIVED_ATTRS:
+            self.__dict__.pop(attr, None)
+        self.cities_df = None
+        
+        mappings = {key: {} for key in _MAPPING_COLUMNS}
+        seen = {key: set() for key in _MAPPING_COLUMNS}
+        total_rows = 0
+        
+        chunks = pd.read_csv(csv_path, usecols=list(_MAPPING_COLUMNS.values()),
+                             dtype='string', chunksize=self.chunksize)
+        for chunk in chunks:
+            total_rows += len(chunk)
+            for key, column in _MAPPING_COLUMNS.items():
+                # Names seen in earlier chunks are skipped, matching a whole-file drop_duplicates
+                names = chunk[column].dropna().drop_duplicates()
+                names = names[~names.isin(seen[key])].astype(object)
+                seen[key].update(names)
+                mappings[key].update(zip(names.str.lower().to_numpy(), names.to_numpy()))
+        
+        self.__dict__['canonical_mappings'] = mappings
+        self.__dict__['data_stats'] = {
+            'total_cities': total_rows,
+            'unique_countries': len(seen['countries']),
+            'unique_states': len(seen['states'])
+        }
+        return mappings
+    
+    def _find_csv(self) -> str:
+        """
+        Locate worldcities.csv in the data directory or its parent
+        
+        Returns:
+            Path to the CSV file
+        """
         csv_path = os.path.join(self.data_path, 'worldcities.csv')
         
         # Try different paths if the file is not found
@@ -44,9 +125,30 @@ class DataProcessor:
             
         if not os.path.exists(csv_path):
             raise FileNotFoundError(f"worldcities.csv not found in {self.data_path} or parent directory")
+        
+        return csv_path
+    
+    def _write_parquet_cache(self, parquet_path: str) -> bool:
+        """
+        Save the loaded data as Parquet so later runs can skip CSV parsing
+        
+        Args:
+            parquet_path: Destination of the cached file
             
-        self.cities_df = pd.read_csv(csv_path)
-        return self.cities_df
+        Returns:
+            True if the cache was written
+        """
+        # Write to a temporary file first so readers never see a partial cache
+        tmp_path = f"{parquet_path}.{os.getpid()}.tmp"
+        try:
+            self.cities_df.to_parquet(tmp_path, compression='zstd', index=False)
+            os.replace(tmp_path, parquet_path)
+            return True
+        except (ImportError, OSError, ValueError):
+            # No Parquet engine or a read-only data directory; keep using the CSV
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
     
     def extract_canonical_names(self) -> Dict[str, Set[str]]:
         """
@@ -55,17 +157,19 @@ class DataProcessor:
         Returns:
             Dictionary containing sets of canonical names for each type
         """
-        if self.cities_df is None:
-            self.load_worldcities_data()
-        
-        # Extract unique cities (using city_ascii for consistent naming)
-        self.cities_set = set(self.cities_df['city_ascii'].dropna().str.lower().unique())
-        
-        # Extract unique countries
-        self.countries_set = set(self.cities_df['country'].dropna().str.lower().unique())
-        
-        # Extract unique states/admin areas
-        self.states_set = set(self.cities_df['admin_name'].dropna().str.lower().unique())
+        return self.canonical_names
+    
+    @functools.cached_property
+    def canonical_names(self) -> Dict[str, Set[str]]:
+        """
+        Sets of lowercase canonical names per type, computed once per load
+        """
+        # The lowercase names are exactly the mapping keys, so reuse them
+        # instead of scanning the DataFrame again
+        mappings = self.canonical_mappings
+        self.cities_set = set(mappings['cities'])
+        self.countries_set = set(mappings['countries'])
+        self.states_set = set(mappings['states'])
         
         return {
             'cities': self.cities_set,
@@ -80,25 +184,22 @@ class DataProcessor:
         Returns:
             Dictionary containing mappings for each geographical type
         """
+        return self.canonical_mappings
+    
+    @functools.cached_property
+    def canonical_mappings(self) -> Dict[str, Dict[str, str]]:
+        """
+        Lowercase to original case mappings per type, computed once per load
+        """
         if self.cities_df is None:
+            if self.chunksize:
+                return self.stream_worldcities_data()
             self.load_worldcities_data()
         
-        # Create city mappings
-        city_mappings = {}
-        for _, row in self.cities_df.iterrows():
-            if pd.notna(row['city_ascii']):
-                city_key = row['city_ascii'].lower()
-                city_mappings[city_key] = row['city_ascii']
-        
-        # Create country mappings
-        country_mappings = {}
-        for country in self.cities_df['country'].dropna().unique():
-            country_mappings[country.lower()] = country
-        
-        # Create state mappings
-        state_mappings = {}
-        for state in self.cities_df['admin_name'].dropna().unique():
-            state_mappings[state.lower()] = state
+        # Build each mapping from the column's distinct values in one pass
+        city_mappings = self._column_mapping('city_ascii')
+        country_mappings = self._column_mapping('country')
+        state_mappings = self._column_mapping('admin_name')
         
         return {
             'cities': city_mappings,
@@ -106,6 +207,20 @@ class DataProcessor:
             'states': state_mappings
         }
     
+    def _column_mapping(self, column: str) -> Dict[str, str]:
+        """
+        Map lowercase names to canonical names for one column
+        
+        Args:
+            column: Name of the DataFrame column
+            
+        Returns:
+            Dictionary from lowercase name to canonical name
+        """
+        # Object dtype keeps Python's str.lower semantics for non-ASCII names
+        names = self.cities_df[column].dropna().drop_duplicates().astype(object)
+        return dict(zip(names.str.lower().to_numpy(), names.to_numpy()))
+    
     def get_data_stats(self) -> Dict[str, int]:
         """
         Get statistics about the loaded data
@@ -113,7 +228,17 @@ class DataProcessor:
         Returns:
             Dictionary containing data statistics
         """
+        return self.data_stats
+    
+    @functools.cached_property
+    def data_stats(self) -> Dict[str, int]:
+        """
+        Statistics about the loaded data, computed once per load
+        """
         if self.cities_df is None:
+            if self.chunksize:
+                self.stream_worldcities_data()
+                return self.__dict__['data_stats']
             self.load_worldcities_data()
         
         return {
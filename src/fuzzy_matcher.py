@@ -3,10 +3,46 @@ Fuzzy Matcher Module for Geospatial NLP System
 Handles fuzzy string matching for geographical entities
 """
 
+import numpy as np
 from rapidfuzz import fuzz, process
-from typing import Dict, List, Tuple, Optional, Set
+from rapidfuzz.utils import default_process
+from typing import Any, Callable, Dict, List, Tuple, Optional, Sequence, Set
+import functools
 import re
 
+# Query cleanup pattern, compiled once
+_PUNCT_RE = re.compile(r'[^\w\s-]')
+
+# Common variations of place names
+_COMMON_REPLACEMENTS = {
+    'new-zealand': 'new zealand',
+    'newyork': 'new york',
+    'losangeles': 'los angeles',
+    'sanfrancisco': 'san francisco',
+    'unitedstates': 'united states',
+    'unitedkingdom': 'united kingdom',
+    'southafrica': 'south africa',
+}
+_REPLACEMENTS_RE = re.compile('|'.join(map(re.escape, _COMMON_REPLACEMENTS)))
+
+
+def _replace_variation(match: 're.Match') -> str:
+    """Substitution callback for _REPLACEMENTS_RE"""
+    return _COMMON_REPLACEMENTS[match.group(0)]
+
+
+# Tables at least this large are shortlisted by shared character bigrams before scoring
+_BLOCKING_MIN_TABLE = 8192
+
+# Candidates kept per shortlisted table
+_BLOCKING_CANDIDATES = 512
+
+
+def _bigrams(text: str) -> Set[str]:
+    """Character bigrams of a space-padded string"""
+    padded = f' {text} '
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
 
 class FuzzyMatcher:
     """
@@ -21,18 +57,89 @@ class FuzzyMatcher:
             canonical_data: Dictionary containing canonical mappings for cities, countries, states
             threshold: Minimum similarity threshold for matches (0-100)
         """
-        self.canonical_data = canonical_data
-        self.threshold = threshold
+        self.canonical_data: Dict[str, Dict[str, str]] = canonical_data
+        self.threshold: float = threshold
+        
+        # Normalize candidates once so scoring can skip per-call processing;
+        # each lookup has a parallel tuple of original case canonical names
+        self.cities_lookup: Tuple[str, ...]
+        self.cities_originals: Tuple[str, ...]
+        self.countries_lookup: Tuple[str, ...]
+        self.countries_originals: Tuple[str, ...]
+        self.states_lookup: Tuple[str, ...]
+        self.states_originals: Tuple[str, ...]
+        self.cities_lookup, self.cities_originals = self._prepare_lookup(canonical_data.get('cities', {}))
+        self.countries_lookup, self.countries_originals = self._prepare_lookup(canonical_data.get('countries', {}))
+        self.states_lookup, self.states_originals = self._prepare_lookup(canonical_data.get('states', {}))
+        
+        # Hash indexes from normalized name to lookup position for exact matches
+        self.cities_exact: Dict[str, int] = self._exact_index(self.cities_lookup)
+        self.countries_exact: Dict[str, int] = self._exact_index(self.countries_lookup)
+        self.states_exact: Dict[str, int] = self._exact_index(self.states_lookup)
+        
+        # All tables pooled into one lookup so a single scoring pass covers every type;
+        # the (start, stop) bounds give each table's slice, in _tables() order
+        self._pool: Tuple[str, ...] = self.cities_lookup + self.countries_lookup + self.states_lookup
+        self._pool_originals: Tuple[str, ...] = (
+            self.cities_originals + self.countries_originals + self.states_originals)
+        bounds: List[Tuple[int, int]] = []
+        start = 0
+        for lookup in (self.cities_lookup, self.countries_lookup, self.states_lookup):
+            bounds.append((start, start + len(lookup)))
+            start += len(lookup)
+        self._pool_bounds: Tuple[Tuple[int, int], ...] = tuple(bounds)
+        
+        # Large tables are pre-filtered with a bigram index (built on first fuzzy lookup)
+        self._blocked_tables: Tuple[int, ...] = tuple(
+            t for t, (start, stop) in enumerate(self._pool_bounds) if stop - start >= _BLOCKING_MIN_TABLE)
         
-        # Create lookup lists for fuzzy matching
-        self.cities_lookup = list(canonical_data.get('cities', {}).keys())
-        self.countries_lookup = list(canonical_data.get('countries', {}).keys())
-        self.states_lookup = list(canonical_data.get('states', {}).keys())
+        # Lowercase to original case mappings (references, not copies)
+        self.city_mappings: Dict[str, str] = canonical_data.get('cities', {})
+        self.country_mappings: Dict[str, str] = canonical_data.get('countries', {})
+        self.state_mappings: Dict[str, str] = canonical_data.get('states', {})
         
-        # Create reverse mappings for getting original case
-        self.city_mappings = canonical_data.get('cities', {})
-        self.country_mappings = canonical_data.get('countries', {})
-        self.state_mappings = canonical_data.get('states', {})
+        # Memoize per-token work for repeated place names. The canonical data must not be
+        # mutated after construction; the threshold can change, so it is part of the match key
+        self._cached_normalize_query: Callable[[str], str] = (
+            functools.lru_cache(maxsize=8192)(self._normalize_query))
+        self._cached_match_query: Callable[[str, float], Tuple[Dict[str, Any], ...]] = (
+            functools.lru_cache(maxsize=4096)(self._match_query))
+    
+    def _prepare_lookup(self, mapping: Dict[str, str]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """
+        Build a normalized lookup and its parallel canonical names
+        
+        Candidates go through the same pipeline as queries (_normalize_query), so a
+        correctly spelled name with punctuation normalizes to the same string.
+        
+        Args:
+            mapping: Dictionary mapping lowercase to original case
+            
+        Returns:
+            Tuple of (normalized names, canonical names) in the same order
+        """
+        # Most keys are already normalized; reuse the key object rather than hold an equal copy
+        lookup = []
+        for name in mapping:
+            normalized = self._normalize_query(name)
+            lookup.append(name if normalized == name else normalized)
+        return tuple(lookup), tuple(mapping.values())
+    
+    @staticmethod
+    def _exact_index(lookup_list: Sequence[str]) -> Dict[str, int]:
+        """
+        Index normalized names by their first position in a lookup
+        
+        Args:
+            lookup_list: Sequence of normalized names
+            
+        Returns:
+            Dictionary mapping each name to its first index
+        """
+        index: Dict[str, int] = {}
+        for position, name in enumerate(lookup_list):
+            index.setdefault(name, position)
+        return index
     
     def preprocess_query(self, query: str) -> str:
         """
@@ -47,36 +154,38 @@ class FuzzyMatcher:
         # Convert to lowercase
         query = query.lower()
         
-        # Remove extra spaces and punctuation
-        query = re.sub(r'[^\w\s-]', '', query)
-        query = re.sub(r'\s+', ' ', query)
-        query = query.strip()
-        
-        # Handle common variations
-        replacements = {
-            'new-zealand': 'new zealand',
-            'newyork': 'new york',
-            'losangeles': 'los angeles',
-            'sanfrancisco': 'san francisco',
-            'unitedstates': 'united states',
-            'unitedkingdom': 'united kingdom',
-            'southafrica': 'south africa',
-        }
-        
-        for old, new in replacements.items():
-            query = query.replace(old, new)
+        # Remove punctuation, then collapse and trim whitespace with split/join
+        query = _PUNCT_RE.sub('', query)
+        query = ' '.join(query.split())
+        
+        # Handle common variations in a single pass
+        query = _REPLACEMENTS_RE.sub(_replace_variation, query)
         
         return query
     
-    def find_best_match(self, query: str, lookup_list: List[str], 
-                       mapping_dict: Dict[str, str]) -> Optional[Tuple[str, float, str]]:
+    def _normalize_query(self, query: str) -> str:
+        """
+        Preprocess a query and normalize it the same way as the lookup candidates
+        
+        Args:
+            query: Input query string
+            
+        Returns:
+            Normalized query string
+        """
+        return default_process(self.preprocess_query(query))
+    
+    def find_best_match(self, query: str, lookup_list: Sequence[str], 
+                       canonical_names: Sequence[str],
+                       exact_index: Optional[Dict[str, int]] = None) -> Optional[Tuple[str, float, str]]:
         """
         Find the best fuzzy match for a query in a lookup list
         
         Args:
             query: Query string to match
-            lookup_list: List of canonical names to search in
-            mapping_dict: Dictionary mapping lowercase to original case
+            lookup_list: Sequence of normalized names to search in
+            canonical_names: Original case names, parallel to lookup_list
+            exact_index: Optional index of lookup_list for exact matches
             
         Returns:
             Tuple of (canonical_name, score, table_type) or None if no good match
@@ -84,44 +193,66 @@ class FuzzyMatcher:
         if not lookup_list:
             return None
         
-        # Preprocess query
-        processed_query = self.preprocess_query(query)
+        # Preprocess query the same way as the candidates
+        processed_query = self._cached_normalize_query(query)
         
-        # Find best match using different algorithms
-        matches = []
+        # Correctly spelled names resolve with one hash lookup
+        if exact_index is not None and processed_query in exact_index:
+            return canonical_names[exact_index[processed_query]], 100.0, 'exact'
         
-        # Ratio matching
-        ratio_match = process.extractOne(processed_query, lookup_list, scorer=fuzz.ratio)
-        if ratio_match and ratio_match[1] >= self.threshold:
-            matches.append(('ratio', ratio_match))
+        # WRatio blends ratio, partial and token-based scorers in a single pass
+        match = process.extractOne(processed_query, lookup_list, scorer=fuzz.WRatio,
+                                   processor=None, score_cutoff=self.threshold)
+        if match is None:
+            return None
+        _, score, index = match
         
-        # Partial ratio matching (good for substring matches)
-        partial_match = process.extractOne(processed_query, lookup_list, scorer=fuzz.partial_ratio)
-        if partial_match and partial_match[1] >= self.threshold:
-            matches.append(('partial', partial_match))
+        return canonical_names[index], score, 'wratio'
+    
+    def batch_match(self, queries: List[str], lookup_list: Sequence[str],
+                    canonical_names: Sequence[str],
+                    exact_index: Optional[Dict[str, int]] = None) -> List[Optional[Tuple[str, float, str]]]:
+        """
+        Find the best fuzzy match for several queries in one scoring pass
         
-        # Token sort ratio (good for word order variations)
-        token_sort_match = process.extractOne(processed_query, lookup_list, scorer=fuzz.token_sort_ratio)
-        if token_sort_match and token_sort_match[1] >= self.threshold:
-            matches.append(('token_sort', token_sort_match))
+        Args:
+            queries: Query strings to match
+            lookup_list: Sequence of normalized names to search in
+            canonical_names: Original case names, parallel to lookup_list
+            exact_index: Optional index of lookup_list for exact matches
+            
+        Returns:
+            One (canonical_name, score, match_type) tuple or None per query
+        """
+        if not queries or not lookup_list:
+            return [None] * len(queries)
         
-        # Token set ratio (good for extra words)
-        token_set_match = process.extractOne(processed_query, lookup_list, scorer=fuzz.token_set_ratio)
-        if token_set_match and token_set_match[1] >= self.threshold:
-            matches.append(('token_set', token_set_match))
+        processed_queries = [self._cached_normalize_query(query) for query in queries]
+        results: List[Optional[Tuple[str, float, str]]] = [None] * len(queries)
         
-        if not matches:
-            return None
+        # Resolve exact names first so only misspellings reach fuzzy scoring
+        pending = []
+        for row, processed_query in enumerate(processed_queries):
+            if exact_index is not None and processed_query in exact_index:
+                results[row] = canonical_names[exact_index[processed_query]], 100.0, 'exact'
+            else:
+                pending.append(row)
+        if not pending:
+            return results
         
-        # Select best match (highest score)
-        best_match = max(matches, key=lambda x: x[1][1])
-        matched_key = best_match[1][0]
-        score = best_match[1][1]
+        # Score matrix of queries x candidates, computed in parallel in C++
+        scores = process.cdist([processed_queries[row] for row in pending], lookup_list,
+                               scorer=fuzz.WRatio, processor=None, score_cutoff=self.threshold,
+                               dtype=np.float64, workers=-1)
+        best_indices = scores.argmax(axis=1)
         
-        # Get original case canonical name
-        canonical_name = mapping_dict.get(matched_key, matched_key)
+        for i, row in enumerate(pending):
+            index = best_indices[i]
+            score = float(scores[i, index])
+            if score > 0 and score >= self.threshold:
+                results[row] = canonical_names[index], score, 'wratio'
         
-        return canonical_name, score, best_match[0]
+        return results
     
     def match_to_cities(self, query: str) -> Optional[Tuple[str, float, str]]:
         """
@@ -133,7 +264,8 @@ class FuzzyMatcher:
         Returns:
             Tuple of (canonical_name, score, match_type) or None
         """
-        result = self.find_best_match(query, self.cities_lookup, self.city_mappings)
+        result = self.find_best_match(query, self.cities_lookup, self.cities_originals,
+                                     self.cities_exact)
         if result:
             return result[0], result[1], 'City'
         return None
@@ -148,7 +280,8 @@ class FuzzyMatcher:
         Returns:
             Tuple of (canonical_name, score, match_type) or None
         """
-        result = self.find_best_match(query, self.countries_lookup, self.country_mappings)
+        result = self.find_best_match(query, self.countries_lookup, self.countries_originals,
+                                     self.countries_exact)
         if result:
             return result[0], result[1], 'Country'
         return None
@@ -163,37 +296,48 @@ class FuzzyMatcher:
         Returns:
             Tuple of (canonical_name, score, match_type) or None
         """
-        result = self.find_best_match(query, self.states_lookup, self.state_mappings)
+        result = self.find_best_match(query, self.states_lookup, self.states_originals,
+                                     self.states_exact)
         if result:
             return result[0], result[1], 'State'
         return None
     
-    def match_query(self, query: str) -> List[Dict[str, any]]:
+    def _tables(self) -> Tuple[Tuple[Sequence[str], Sequence[str], Dict[str, int], str], ...]:
         """
-        Match a query to all geographical types and return best matches
+        Lookup structures of every geographical type, with the type name
+        
+        Returns:
+            Tuples of (lookup, canonical names, exact index, table type)
+        """
+        return (
+            (self.cities_lookup, self.cities_originals, self.cities_exact, 'City'),
+            (self.countries_lookup, self.countries_originals, self.countries_exact, 'Country'),
+            (self.states_lookup, self.states_originals, self.states_exact, 'State'),
+        )
+    
+    @staticmethod
+    def _collect_matches(query: str, table_matches: List[Tuple[Optional[Tuple[str, float, str]], str]]) -> List[Dict[str, Any]]:
+        """
+        Turn per-table best matches into match dictionaries, best first
         
         Args:
-            query: Query string to match
+            query: Query string that was matched
+            table_matches: (match tuple or None, table type) for each table
             
         Returns:
             List of match dictionaries with details
         """
-        matches = []
-        
-        # Try matching to each type
-        city_match = self.match_to_cities(query)
-        country_match = self.match_to_countries(query)
-        state_match = self.match_to_states(query)
+        matches: List[Dict[str, Any]] = []
         
         # Collect all valid matches
-        for match, table_type in [(city_match, 'City'), (country_match, 'Country'), (state_match, 'State')]:
+        for match, table_type in table_matches:
             if match:
                 matches.append({
                     'token': query,
                     'canonical_name': match[0],
-                    'table': match[2],
+                    'table': table_type,
                     'confidence_score': match[1],
-                    'match_algorithm': match[2] if len(match) > 2 else 'unknown'
+                    'match_algorithm': match[2]
                 })
         
         # Sort by confidence score
@@ -201,7 +345,154 @@ class FuzzyMatcher:
         
         return matches
     
-    def get_best_match(self, query: str) -> Optional[Dict[str, any]]:
+    def match_query(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Match a query to all geographical types and return best matches
+        
+        Args:
+            query: Query string to match
+            
+        Returns:
+            List of match dictionaries with details
+        """
+        matches = self._cached_match_query(query, self.threshold)
+        
+        # Hand out copies so callers cannot mutate the cached entries
+        return [dict(match) for match in matches]
+    
+    def _match_query(self, query: str, threshold: float) -> Tuple[Dict[str, Any], ...]:
+        """
+        Match a query to all geographical types
+        
+        Args:
+            query: Query string to match
+            threshold: Threshold in effect (used as part of the cache key)
+            
+        Returns:
+            Tuple of match dictionaries with details
+        """
+        return tuple(self.match_queries_batch([query], threshold=threshold)[0])
+    
+    def match_queries_batch(self, queries: List[str], exact_first: bool = False,
+                            threshold: Optional[float] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Match several queries to all geographical types at once
+        
+        Args:
+            queries: Query strings to match
+            exact_first: Skip fuzzy scoring for queries that are an exact name in any
+                table, returning only their exact matches
+            threshold: Minimum similarity for fuzzy matches (defaults to self.threshold)
+            
+        Returns:
+            One list of match dictionaries per query, best match first
+        """
+        if not queries:
+            return []
+        
+        threshold = self.threshold if threshold is None else threshold
+        tables = self._tables()
+        processed_queries = [self._cached_normalize_query(query) for query in queries]
+        
+        # Resolve exact names per table; only queries with an unresolved table get scored
+        table_results: List[List[Optional[Tuple[str, float, str]]]] = []
+        pending = []
+        for row, processed_query in enumerate(processed_queries):
+            row_results: List[Optional[Tuple[str, float, str]]] = [None] * len(tables)
+            for t, (_, originals, exact, _) in enumerate(tables):
+                if processed_query in exact:
+                    row_results[t] = originals[exact[processed_query]], 100.0, 'exact'
+            table_results.append(row_results)
+            if None in row_results and not (exact_first and any(row_results)):
+                pending.append(row)
+        
+        if pending and self._pool:
+            if self._blocked_tables:
+                # Score each query against its shortlist of the pool only
+                scored = []
+                for row in pending:
+                    indices = self._shortlist(processed_queries[row])
+                    scores = process.cdist([processed_queries[row]], [self._pool[i] for i in indices],
+                                           scorer=fuzz.WRatio, processor=None, score_cutoff=threshold,
+                                           dtype=np.float64, workers=-1)
+                    scored.append((indices, scores[0]))
+            else:
+                # One multi-threaded score matrix over the whole pooled lookup
+                indices = np.arange(len(self._pool))
+                scores = process.cdist([processed_queries[row] for row in pending], self._pool,
+                                       scorer=fuzz.WRatio, processor=None, score_cutoff=threshold,
+                                       dtype=np.float64, workers=-1)
+                scored = [(indices, row_scores) for row_scores in scores]
+            
+            # Best candidate within each table's slice; scored indices are in pool order
+            for row, (indices, scores) in zip(pending, scored):
+                for t, (start, stop) in enumerate(self._pool_bounds):
+                    low, high = np.searchsorted(indices, (start, stop))
+                    if table_results[row][t] is not None or low == high:
+                        continue
+                    best = low + int(scores[low:high].argmax())
+                    score = float(scores[best])
+                    if score > 0 and score >= threshold:
+                        table_results[row][t] = self._pool_originals[indices[best]], score, 'wratio'
+        
+        return [self._collect_matches(query, [(match, table[3]) for match, table in zip(row_results, tables)])
+                for query, row_results in zip(queries, table_results)]
+    
+    @functools.cached_property
+    def _bigram_index(self) -> Dict[int, Tuple[Dict[str, np.ndarray], np.ndarray]]:
+        """
+        Per blocked table: posting lists of table-relative positions per character
+        bigram, and the number of distinct bigrams of each name
+        """
+        index: Dict[int, Tuple[Dict[str, np.ndarray], np.ndarray]] = {}
+        for t in self._blocked_tables:
+            start, stop = self._pool_bounds[t]
+            positions: Dict[str, List[int]] = {}
+            sizes = np.empty(stop - start, dtype=np.int32)
+            for position, name in enumerate(self._pool[start:stop]):
+                name_bigrams = _bigrams(name)
+                sizes[position] = len(name_bigrams)
+                for bigram in name_bigrams:
+                    positions.setdefault(bigram, []).append(position)
+            postings = {bigram: np.array(found, dtype=np.int32) for bigram, found in positions.items()}
+            index[t] = postings, sizes
+        return index
+    
+    def _shortlist(self, processed_query: str) -> np.ndarray:
+        """
+        Pool indices worth scoring for a query, in ascending order
+        
+        Small tables are kept whole; blocked tables keep the candidates with the
+        highest bigram overlap coefficient, which also favors names contained in
+        the query or containing it.
+        
+        Args:
+            processed_query: Normalized query string
+            
+        Returns:
+            Array of pool indices
+        """
+        query_bigrams = _bigrams(processed_query)
+        parts = []
+        for t, (start, stop) in enumerate(self._pool_bounds):
+            postings: List[np.ndarray] = []
+            if t in self._blocked_tables:
+                table_postings, sizes = self._bigram_index[t]
+                postings = [table_postings[bigram] for bigram in query_bigrams if bigram in table_postings]
+            if not postings:
+                # Unblocked table, or nothing in common: scan the whole table
+                parts.append(np.arange(start, stop))
+                continue
+            
+            shared = np.bincount(np.concatenate(postings), minlength=stop - start)
+            overlap = shared / np.minimum(sizes, len(query_bigrams))
+            keep = min(_BLOCKING_CANDIDATES, stop - start)
+            top = np.argpartition(overlap, -keep)[-keep:]
+            parts.append(np.sort(top[shared[top] > 0]) + start)
+        
+        return np.concatenate(parts)
+    
+    def get_best_match(self, query: str) -> Optional[Dict[str, Any]]:
         """
         Get the single best match for a query
         
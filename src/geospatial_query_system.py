@@ -3,16 +3,21 @@ Main Geospatial Query System
 Orchestrates the entire pipeline for geospatial entity extraction and matching
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, TYPE_CHECKING
+import copy
+import functools
 import os
 import sys
+import threading
 
 # Add src directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from data_processor import DataProcessor
-from nlp_processor import NLPProcessor
-from fuzzy_matcher import FuzzyMatcher
+# The components pull in pandas, spaCy and rapidfuzz, so they are imported where first used
+if TYPE_CHECKING:
+    from data_processor import DataProcessor
+    from nlp_processor import NLPProcessor
+    from fuzzy_matcher import FuzzyMatcher
 
 
 class GeospatialQuerySystem:
@@ -20,34 +25,85 @@ class GeospatialQuerySystem:
     Main system for processing natural language queries and extracting geospatial entities
     """
     
-    def __init__(self, data_path: str = None, fuzzy_threshold: float = 80):
+    def __init__(self, data_path: str = None, fuzzy_threshold: float = 80,
+                 data_chunksize: Optional[int] = None, nlp_mode: Optional[str] = None):
         """
         Initialize the geospatial query system
         
         Args:
             data_path: Path to the data directory
             fuzzy_threshold: Minimum similarity threshold for fuzzy matching
+            data_chunksize: Rows per chunk when streaming the CSV instead of loading it
+            nlp_mode: Place extraction mode ('ner', 'gazetteer' or 'hybrid', see NLPProcessor)
         """
-        self.data_processor = DataProcessor(data_path)
-        self.nlp_processor = NLPProcessor()
-        self.fuzzy_matcher = None
+        from data_processor import DataProcessor
+        
+        self.data_processor = DataProcessor(data_path, chunksize=data_chunksize)
         self.fuzzy_threshold = fuzzy_threshold
+        self.nlp_mode = nlp_mode
         
-        # Initialize the system
-        self.setup()
+        # Data and models load on first use (see fuzzy_matcher and nlp_processor)
+        self._fuzzy_matcher = None
+        self._nlp_processor = None
+        
+        # Reentrant, since building the NLP processor sets up the fuzzy matcher first
+        self._setup_lock = threading.RLock()
+        
+        # Memoize query results; the threshold is part of the key since it can change at runtime
+        self._cached_process_query = functools.lru_cache(maxsize=1024)(self._process_query)
+    
+    @property
+    def fuzzy_matcher(self) -> 'FuzzyMatcher':
+        """
+        Fuzzy matcher over the loaded data, set up on first access
+        """
+        if self._fuzzy_matcher is None:
+            with self._setup_lock:
+                if self._fuzzy_matcher is None:
+                    self.setup()
+        return self._fuzzy_matcher
+    
+    @property
+    def nlp_processor(self) -> 'NLPProcessor':
+        """
+        NLP processor, created on first access with the loaded place names as its gazetteer
+        """
+        if self._nlp_processor is None:
+            with self._setup_lock:
+                if self._nlp_processor is None:
+                    self._nlp_processor = self._build_nlp_processor()
+        return self._nlp_processor
+    
+    def _build_nlp_processor(self) -> 'NLPProcessor':
+        """
+        Create the NLP processor and load the place names as its gazetteer
+        """
+        from nlp_processor import NLPProcessor
+        
+        nlp_processor = NLPProcessor(self.nlp_mode)
+        
+        # Reuse the mappings setup() loaded rather than reading the data a second time
+        canonical_mappings = self.fuzzy_matcher.canonical_data
+        nlp_processor.load_gazetteer(name for mapping in canonical_mappings.values() for name in mapping.values())
+        return nlp_processor
     
     def setup(self):
         """
         Setup the system by loading data and initializing components
         """
+        from fuzzy_matcher import FuzzyMatcher
+        
         print("Loading geographical data...")
         try:
-            # Load and process data
-            self.data_processor.load_worldcities_data()
+            # Load and process data (streamed when a chunk size is configured)
+            if self.data_processor.chunksize:
+                self.data_processor.stream_worldcities_data()
+            else:
+                self.data_processor.load_worldcities_data()
             canonical_mappings = self.data_processor.get_canonical_mappings()
             
             # Initialize fuzzy matcher
-            self.fuzzy_matcher = FuzzyMatcher(canonical_mappings, self.fuzzy_threshold)
+            self._fuzzy_matcher = FuzzyMatcher(canonical_mappings, self.fuzzy_threshold)
             
             # Get data statistics
             stats = self.data_processor.get_data_stats()
@@ -58,33 +114,103 @@ class GeospatialQuerySystem:
             print(f"Error during setup: {e}")
             raise
     
-    def process_query(self, query: str, detailed: bool = False) -> List[Dict[str, any]]:
+    def process_query(self, query: str, detailed: bool = False,
+                      threshold: Optional[float] = None) -> List[Dict[str, any]]:
         """
         Process a natural language query and extract geospatial entities
         
         Args:
             query: Natural language query containing place names
             detailed: Whether to return detailed matching information
+            threshold: Fuzzy threshold for this query (defaults to the matcher's threshold)
             
         Returns:
             List of extracted and matched geospatial entities
         """
-        if not self.fuzzy_matcher:
-            raise RuntimeError("System not properly initialized. Please check setup.")
+        if threshold is None:
+            threshold = self.fuzzy_matcher.threshold
+        results = self._cached_process_query(query, threshold, detailed)
+        
+        # Hand out copies so callers cannot mutate the cached entries; detailed results
+        # nest the match dicts (the best match included), so those are copied deeply
+        if detailed:
+            return copy.deepcopy(list(results))
+        return [dict(result) for result in results]
+    
+    def _process_query(self, query: str, threshold: float, detailed: bool) -> Tuple[Dict[str, any], ...]:
+        """
+        Run the full extraction and matching pipeline for a query
         
+        Args:
+            query: Natural language query containing place names
+            threshold: Fuzzy threshold to match with (also part of the cache key)
+            detailed: Whether to return detailed matching information
+            
+        Returns:
+            Tuple of extracted and matched geospatial entities
+        """
         # Step 1: Preprocess the query
         processed_query = self.nlp_processor.preprocess_text(query)
         
         # Step 2: Extract potential place names using NLP
-        potential_places = self.nlp_processor.extract_all_potential_places(processed_query)
+        potential_places = self.nlp_processor.extract_all_potential_places(processed_query, preprocess=False)
         
         if not potential_places:
-            return []
+            return ()
+        
+        # Step 3: Match all potential places to canonical names in one batch; places that
+        # are exact names (such as gazetteer hits) skip fuzzy scoring unless all matches are wanted
+        all_matches = self.fuzzy_matcher.match_queries_batch(potential_places, exact_first=not detailed,
+                                                             threshold=threshold)
+        
+        return tuple(self._best_matches(query, processed_query, all_matches, detailed))
+    
+    def process_queries(self, queries: List[str], detailed: bool = False,
+                        threshold: Optional[float] = None) -> List[List[Dict[str, any]]]:
+        """
+        Process several queries, running extraction and matching as batches
+        
+        Args:
+            queries: Natural language queries containing place names
+            detailed: Whether to return detailed matching information
+            threshold: Fuzzy threshold for these queries (defaults to the matcher's threshold)
+            
+        Returns:
+            List of extracted and matched geospatial entities for each query
+        """
+        processed_queries = [self.nlp_processor.preprocess_text(query) for query in queries]
+        places_per_query = self.nlp_processor.extract_all_potential_places(processed_queries, preprocess=False)
         
-        # Step 3: Match each potential place to canonical names
+        # Match the places of every query together, then split the matches back per query
+        all_places = [place for places in places_per_query for place in places]
+        all_matches = self.fuzzy_matcher.match_queries_batch(all_places, exact_first=not detailed,
+                                                             threshold=threshold)
+        
+        results = []
+        offset = 0
+        for query, processed_query, places in zip(queries, processed_queries, places_per_query):
+            matches = all_matches[offset:offset + len(places)]
+            offset += len(places)
+            results.append(self._best_matches(query, processed_query, matches, detailed))
+        
+        return results
+    
+    def _best_matches(self, query: str, processed_query: str, all_matches: List[List[Dict[str, any]]],
+                      detailed: bool) -> List[Dict[str, any]]:
+        """
+        Keep the best match of each potential place that matched anything
+        
+        Args:
+            query: Original natural language query
+            processed_query: Query after preprocessing
+            all_matches: Match lists of the query's potential places, best match first
+            detailed: Whether to return detailed matching information
+            
+        Returns:
+            List of matched geospatial entities
+        """
         results = []
-        for place in potential_places:
-            matches = self.fuzzy_matcher.match_query(place)
+        for matches in all_matches:
             
             if matches:
                 # Take the best match for each place
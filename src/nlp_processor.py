@@ -3,14 +3,121 @@ NLP Processor Module for Geospatial NLP System
 Handles natural language processing tasks for extracting place names
 """
 
+import functools
+import itertools
+import os
 import re
-import spacy
-from typing import List, Tuple, Set
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.tag import pos_tag
-from nltk.chunk import ne_chunk
-from nltk.tree import Tree
+from typing import Dict, Iterable, List, Literal, Optional, Tuple, Set, Union, TYPE_CHECKING
+
+# spaCy takes seconds to import, so it is imported where first used
+if TYPE_CHECKING:
+    import spacy
+    from spacy.matcher import PhraseMatcher
+
+
+# Capitalized words (including hyphenated ones), with following capitalized words joined into one phrase
+_CAPITALIZED_RE = re.compile(r'\b[A-Z][a-zA-Z\-]+(?:\s+[A-Z][a-zA-Z\-]+)*\b')
+
+# Common capitalized words that are not place names
+_CAPITALIZED_STOP_WORDS = frozenset({
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December',
+    'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday',
+    'Which', 'Show', 'The', 'This', 'That', 'These', 'Those', 'And', 'Or', 'But',
+    'A', 'An', 'As', 'At', 'By', 'For', 'From', 'In', 'Into', 'Of', 'On', 'To',
+    'With', 'Without', 'Graph', 'Chart', 'Temperature', 'Rainfall', 'Average'
+})
+
+# Texts at least this long are scanned by the Numba kernel in _capscan when it is available
+_CAPSCAN_MIN_LENGTH = 1024
+
+
+def _scan_capitalized(text: str) -> Optional[Tuple[List[int], List[int]]]:
+    """Start and end offsets of _CAPITALIZED_RE matches from the Numba kernel, or None to use the regex"""
+    if len(text) < _CAPSCAN_MIN_LENGTH or not text.isascii():
+        return None
+    
+    # Numba is optional and slow to import, so it is only loaded once a long text shows up
+    from _capscan import NUMBA_AVAILABLE
+    if not NUMBA_AVAILABLE:
+        return None
+    
+    import numpy as np
+    from _capscan import find_caps
+    
+    starts, ends = find_caps(np.frombuffer(text.encode('ascii'), dtype=np.uint8))
+    return starts.tolist(), ends.tolist()
+
+
+def _capitalized_spans(text: str) -> List[Tuple[int, int, str]]:
+    """_CAPITALIZED_RE matches of a text as (start, end, text) spans"""
+    scanned = _scan_capitalized(text)
+    if scanned is None:
+        return [(match.start(), match.end(), match.group()) for match in _CAPITALIZED_RE.finditer(text)]
+    return [(start, end, text[start:end]) for start, end in zip(*scanned)]
+
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Common spellings of country names and their replacements, matched in a single pass
+_VARIATION_PATTERNS = (
+    (r'New-Zealand', 'New Zealand'),
+    (r'U\.S\.A\.?', 'United States'),
+    (r'U\.K\.?', 'United Kingdom'),
+)
+_VARIATIONS_RE = re.compile('|'.join(f'({pattern})' for pattern, _ in _VARIATION_PATTERNS), re.IGNORECASE)
+
+
+def _replace_variation(match: 're.Match') -> str:
+    """Substitution callback for _VARIATIONS_RE"""
+    return _VARIATION_PATTERNS[match.lastindex - 1][1]
+
+
+# spaCy entity labels kept as places: geopolitical entities and locations
+_GEO_LABELS = frozenset({'GPE', 'LOC'})
+
+# Pipeline components not needed for entity recognition, skipped at load time
+_UNUSED_PIPES = ['tagger', 'parser', 'attribute_ruler', 'lemmatizer']
+
+# Batches smaller than this run in-process; forking workers costs more than it saves
+_MIN_PARALLEL_TEXTS = 32
+
+# Loaded spaCy pipelines shared by every NLPProcessor, keyed by model name
+_NLP_CACHE: Dict[str, 'spacy.Language'] = {}
+
+
+def _get_nlp(name: str) -> 'spacy.Language':
+    """
+    Load a spaCy pipeline once per process and reuse it afterwards
+    
+    Only the components entity recognition depends on are loaded.
+    
+    Args:
+        name: Name of the spaCy model package, or 'blank:en' for a blank English pipeline
+        
+    Returns:
+        The loaded spaCy Language object
+    """
+    if name not in _NLP_CACHE:
+        import spacy
+        
+        if name == 'blank:en':
+            _NLP_CACHE[name] = spacy.blank('en')
+        else:
+            _NLP_CACHE[name] = spacy.load(name, exclude=_UNUSED_PIPES)
+    return _NLP_CACHE[name]
+
+
+# Extraction modes: statistical NER only, gazetteer only (no model load), or the gazetteer with NER fallback
+NLP_MODES = ('ner', 'gazetteer', 'hybrid')
+
+# Built gazetteer matchers, keyed by the pipeline whose vocab they use and their place names
+_GAZETTEER_CACHE: Dict[Tuple[int, frozenset], 'PhraseMatcher'] = {}
+
+
+def _overlaps(start: int, end: int, spans: List[Tuple[int, int, str]]) -> bool:
+    """Whether the character range [start, end) overlaps any (start, end, text) span"""
+    return any(start < span_end and span_start < end for span_start, span_end, _ in spans)
 
 
 class NLPProcessor:
@@ -18,44 +125,109 @@ class NLPProcessor:
     Handles NLP tasks for extracting geographical entities from text
     """
     
-    def __init__(self):
+    def __init__(self, mode: Optional[Literal['ner', 'gazetteer', 'hybrid']] = None):
         """
         Initialize the NLP processor with required models
+        
+        Args:
+            mode: Extraction mode, one of NLP_MODES (defaults to the GEO_NLP_MODE
+                environment variable, then 'hybrid'); 'gazetteer' skips loading the spaCy model
         """
+        mode = mode or os.environ.get('GEO_NLP_MODE', 'hybrid')
+        if mode not in NLP_MODES:
+            raise ValueError(f"Unknown NLP mode {mode!r}, expected one of {', '.join(NLP_MODES)}")
+        
+        self.mode = mode
         self.nlp = None
+        self.gazetteer: Optional['PhraseMatcher'] = None
+        self._gazetteer_nlp = None
+        
+        # Bulk extraction settings, overridable through the environment
+        self.batch_size = int(os.environ.get('GEO_SPACY_BATCH_SIZE', 64))
+        self.n_process = int(os.environ.get('GEO_SPACY_N_PROCESS', max(1, (os.cpu_count() or 1) // 2)))
+        
+        # Memoize extraction per text; cleared whenever the models or gazetteer change
+        self._cached_extract_places = functools.lru_cache(maxsize=1024)(self._extract_places)
+        
         self.setup_models()
     
     def setup_models(self):
         """
-        Setup and download required NLP models
+        Setup required NLP models
         """
+        self._cached_extract_places.cache_clear()
+        if self.mode == 'gazetteer':
+            # Only the tokenizer is needed, and load_gazetteer brings a blank one
+            self.nlp = None
+            return
+        
         try:
             # Try to load spaCy model
-            self.nlp = spacy.load("en_core_web_sm")
+            self.nlp = _get_nlp("en_core_web_sm")
         except OSError:
             print("spaCy English model not found. Please install with: python -m spacy download en_core_web_sm")
             self.nlp = None
+    
+    def load_gazetteer(self, names: Iterable[str]):
+        """
+        Build a phrase matcher over known place names
         
-        # Download required NLTK data
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt')
+        Once loaded, known names are matched directly and spaCy NER only runs for
+        texts with capitalized phrases the gazetteer does not cover. Does nothing in
+        'ner' mode.
         
-        try:
-            nltk.data.find('taggers/averaged_perceptron_tagger')
-        except LookupError:
-            nltk.download('averaged_perceptron_tagger')
+        Args:
+            names: Canonical place names, matched case-sensitively
+        """
+        if self.mode == 'ner':
+            return
         
-        try:
-            nltk.data.find('chunkers/maxent_ne_chunker')
-        except LookupError:
-            nltk.download('maxent_ne_chunker')
+        # Matching needs only the tokenizer, so a blank pipeline stands in without the model
+        self._gazetteer_nlp = self.nlp if self.nlp is not None else _get_nlp('blank:en')
         
-        try:
-            nltk.data.find('corpora/words')
-        except LookupError:
-            nltk.download('words')
+        key = (id(self._gazetteer_nlp), frozenset(names))
+        if key not in _GAZETTEER_CACHE:
+            from spacy.matcher import PhraseMatcher
+            
+            # ORTH keeps matching case-sensitive; lowercase words such as "of" are also place names
+            gazetteer = PhraseMatcher(self._gazetteer_nlp.vocab, attr='ORTH')
+            gazetteer.add('PLACE', list(self._gazetteer_nlp.tokenizer.pipe(key[1])))
+            _GAZETTEER_CACHE[key] = gazetteer
+        self.gazetteer = _GAZETTEER_CACHE[key]
+        self._cached_extract_places.cache_clear()
+    
+    def extract_gazetteer_matches(self, text: str) -> List[str]:
+        """
+        Extract known place names using the gazetteer
+        
+        Args:
+            text: Input text to process
+            
+        Returns:
+            List of known place names, longest match first where they overlap
+        """
+        return [span_text for _, _, span_text in self._gazetteer_spans(text)]
+    
+    def _gazetteer_spans(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Find non-overlapping gazetteer matches as (start_char, end_char, text) spans
+        
+        Args:
+            text: Input text to process
+            
+        Returns:
+            List of matched spans in text order
+        """
+        if self.gazetteer is None:
+            return []
+        
+        from spacy.util import filter_spans
+        
+        # make_doc only tokenizes, skipping every pipeline component
+        doc = self._gazetteer_nlp.make_doc(text)
+        spans = filter_spans([doc[start:end] for _, start, end in self.gazetteer(doc)])
+        return [(span.start_char, span.end_char, span.text) for span in spans
+                if span.text not in _CAPITALIZED_STOP_WORDS]
     
     def extract_potential_places_spacy(self, text: str) -> List[str]:
         """
@@ -67,45 +239,52 @@ class NLPProcessor:
         Returns:
             List of potential place names
         """
+        # No model in gazetteer mode or when en_core_web_sm is missing
         if self.nlp is None:
             return []
         
-        doc = self.nlp(text)
-        places = []
-        
-        for ent in doc.ents:
-            # Extract geographical entities
-            if ent.label_ in ['GPE', 'LOC']:  # Geopolitical entities and locations
-                places.append(ent.text.strip())
-        
-        return places
+        # Extract geographical entities
+        return [ent.text for ent in self.nlp(text).ents if ent.label_ in _GEO_LABELS]
     
-    def extract_potential_places_nltk(self, text: str) -> List[str]:
+    def extract_potential_places_spacy_batch(self, texts: List[str], batch_size: int = 64,
+                                             n_process: int = 1) -> List[List[str]]:
         """
-        Extract potential place names using NLTK NER
+        Extract potential place names from several texts with one spaCy pipe
         
         Args:
-            text: Input text to process
+            texts: Input texts to process
+            batch_size: Number of texts spaCy processes per batch
+            n_process: Number of worker processes spaCy uses
             
         Returns:
-            List of potential place names
+            List of potential place names for each input text
+        """
+        return [[place for _, _, place in spans] for spans in self._entity_spans_batch(texts, batch_size, n_process)]
+    
+    def _entity_spans_batch(self, texts: List[str], batch_size: int = 64,
+                            n_process: int = 1) -> List[List[Tuple[int, int, str]]]:
         """
-        # Tokenize and tag
-        tokens = word_tokenize(text)
-        pos_tags = pos_tag(tokens)
+        Run spaCy NER over several texts and keep place entities as (start_char, end_char, text) spans
         
-        # Named entity recognition
-        chunks = ne_chunk(pos_tags)
+        Args:
+            texts: Input texts to process
+            batch_size: Number of texts spaCy processes per batch
+            n_process: Number of worker processes spaCy uses
+            
+        Returns:
+            List of place entity spans for each input text
+        """
+        if self.nlp is None:
+            return [[] for _ in texts]
         
-        places = []
-        for chunk in chunks:
-            if isinstance(chunk, Tree):
-                if chunk.label() in ['GPE', 'LOCATION']:
-                    # Extract the entity text
-                    entity = ' '.join([token for token, pos in chunk.leaves()])
-                    places.append(entity)
+        # Small batches stay in-process
+        if len(texts) <= _MIN_PARALLEL_TEXTS:
+            n_process = 1
         
-        return places
+        return [
+            [(ent.start_char, ent.end_char, ent.text) for ent in doc.ents if ent.label_ in _GEO_LABELS]
+            for doc in self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+        ]
     
     def extract_capitalized_words(self, text: str) -> List[str]:
         """
@@ -117,52 +296,146 @@ class NLPProcessor:
         Returns:
             List of capitalized words
         """
-        # Pattern to match capitalized words (including hyphenated ones)
-        pattern = r'\b[A-Z][a-zA-Z\-]+(?:\s+[A-Z][a-zA-Z\-]+)*\b'
-        matches = re.findall(pattern, text)
+        scanned = _scan_capitalized(text)
+        if scanned is None:
+            matches = _CAPITALIZED_RE.findall(text)
+        else:
+            matches = [text[start:end] for start, end in zip(*scanned)]
         
         # Filter out common non-place words
-        stop_words = {
-            'January', 'February', 'March', 'April', 'May', 'June',
-            'July', 'August', 'September', 'October', 'November', 'December',
-            'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday',
-            'Which', 'Show', 'The', 'This', 'That', 'These', 'Those', 'And', 'Or', 'But',
-            'A', 'An', 'As', 'At', 'By', 'For', 'From', 'In', 'Into', 'Of', 'On', 'To',
-            'With', 'Without', 'Graph', 'Chart', 'Temperature', 'Rainfall', 'Average'
-        }
-        
-        filtered_matches = [match for match in matches if match not in stop_words]
-        return filtered_matches
+        return [match for match in matches if match not in _CAPITALIZED_STOP_WORDS]
     
-    def extract_all_potential_places(self, text: str) -> List[str]:
+    def extract_all_potential_places(self, text: Union[str, List[str]],
+                                     preprocess: bool = True) -> Union[List[str], List[List[str]]]:
         """
         Extract all potential place names using multiple methods
         
+        Args:
+            text: Input text to process, or a list of texts to process as one batch
+            preprocess: Whether to run preprocess_text first (skip for already preprocessed text)
+            
+        Returns:
+            Combined list of potential place names, or one such list per input text
+        """
+        if isinstance(text, str):
+            if preprocess:
+                text = self.preprocess_text(text)
+            
+            # Repeated texts are served from the cache; a copy keeps callers from mutating it
+            return list(self._cached_extract_places(text))
+        
+        return self.extract_all_potential_places_batch(list(text), preprocess=preprocess)
+    
+    def extract_all_potential_places_batch(self, texts: List[str], n_process: Optional[int] = None,
+                                           batch_size: Optional[int] = None,
+                                           preprocess: bool = True) -> List[List[str]]:
+        """
+        Extract all potential place names from several texts, running spaCy over them together
+        
+        Args:
+            texts: Input texts to process
+            n_process: Number of spaCy worker processes (defaults to self.n_process;
+                batches of up to 32 texts always run in-process)
+            batch_size: Number of texts spaCy processes per batch (defaults to self.batch_size)
+            preprocess: Whether to run preprocess_text on each text first
+            
+        Returns:
+            Combined list of potential place names for each input text
+        """
+        if preprocess:
+            texts = [self.preprocess_text(text) for text in texts]
+        
+        n_process = self.n_process if n_process is None else n_process
+        batch_size = self.batch_size if batch_size is None else batch_size
+        
+        if self.gazetteer is not None:
+            return self._extract_with_gazetteer(texts, batch_size, n_process)
+        
+        # Method 1 for a batch: all texts go through the spaCy pipeline together
+        spacy_batches = self.extract_potential_places_spacy_batch(texts, batch_size, n_process)
+        return [self._combine_potential_places(item, spacy_places)
+                for item, spacy_places in zip(texts, spacy_batches)]
+    
+    def _extract_places(self, text: str) -> Tuple[str, ...]:
+        """
+        Extract all potential place names from a single text
+        
         Args:
             text: Input text to process
             
         Returns:
-            Combined list of potential place names
+            Tuple of potential place names
         """
-        all_places = []
+        if self.gazetteer is not None:
+            return tuple(self._extract_with_gazetteer([text])[0])
         
         # Method 1: spaCy NER
-        if self.nlp:
-            spacy_places = self.extract_potential_places_spacy(text)
-            all_places.extend(spacy_places)
-        
-        # Method 2: NLTK NER
-        nltk_places = self.extract_potential_places_nltk(text)
-        all_places.extend(nltk_places)
+        spacy_places = self.extract_potential_places_spacy(text)
+        return tuple(self._combine_potential_places(text, spacy_places))
+    
+    def _combine_potential_places(self, text: str, spacy_places: List[str]) -> List[str]:
+        """
+        Add the capitalized-word candidates to the spaCy places of a text
         
-        # Method 3: Capitalized words
+        Args:
+            text: Input text to process
+            spacy_places: Places already found in the text by spaCy
+            
+        Returns:
+            Combined list of potential place names
+        """
+        # Method 2: Capitalized words
         cap_words = self.extract_capitalized_words(text)
-        all_places.extend(cap_words)
         
-        # Remove duplicates while preserving order
+        return self._unique_places(itertools.chain(spacy_places, cap_words))
+    
+    def _extract_with_gazetteer(self, texts: List[str], batch_size: int = 64,
+                                n_process: int = 1) -> List[List[str]]:
+        """
+        Extract potential place names with the gazetteer, using NER only for unknown phrases
+        
+        Args:
+            texts: Input texts to process
+            batch_size: Number of texts spaCy processes per batch
+            n_process: Number of worker processes spaCy uses
+            
+        Returns:
+            Combined list of potential place names for each input text
+        """
+        known_spans = [self._gazetteer_spans(item) for item in texts]
+        
+        # Capitalized phrases overlapping a known name are already covered by it
+        unknown_spans = [
+            [span for span in _capitalized_spans(item)
+             if span[2] not in _CAPITALIZED_STOP_WORDS and not _overlaps(span[0], span[1], known)]
+            for item, known in zip(texts, known_spans)
+        ]
+        
+        # spaCy NER only runs on the texts left with unknown capitalized phrases
+        pending = [i for i, spans in enumerate(unknown_spans) if spans]
+        entity_spans: List[List[Tuple[int, int, str]]] = [[] for _ in texts]
+        pending_spans = self._entity_spans_batch([texts[i] for i in pending], batch_size, n_process)
+        for i, spans in zip(pending, pending_spans):
+            entity_spans[i] = [span for span in spans if not _overlaps(span[0], span[1], known_spans[i])]
+        
+        return [self._unique_places(span[2] for span in itertools.chain(known, entities, unknown))
+                for known, entities, unknown in zip(known_spans, entity_spans, unknown_spans)]
+    
+    @staticmethod
+    def _unique_places(places: Iterable[str]) -> List[str]:
+        """
+        Strip places and drop empty and repeated ones, preserving order
+        
+        Args:
+            places: Candidate place names, possibly from several methods
+            
+        Returns:
+            List of unique potential place names
+        """
+        # Streams the candidates without concatenating the sources first
         seen = set()
         unique_places = []
-        for place in all_places:
+        for place in places:
             place_clean = place.strip()
             if place_clean and place_clean not in seen:
                 seen.add(place_clean)
@@ -181,12 +454,10 @@ class NLPProcessor:
             Preprocessed text
         """
         # Basic cleaning
-        text = re.sub(r'\s+', ' ', text)  # Multiple spaces to single space
+        text = _WHITESPACE_RE.sub(' ', text)  # Multiple spaces to single space
         text = text.strip()
         
         # Handle common variations
-        text = re.sub(r'New-Zealand', 'New Zealand', text, flags=re.IGNORECASE)
-        text = re.sub(r'U\.S\.A\.?', 'United States', text, flags=re.IGNORECASE)
-        text = re.sub(r'U\.K\.?', 'United Kingdom', text, flags=re.IGNORECASE)
+        text = _VARIATIONS_RE.sub(_replace_variation, text)
         
         return text
@@ -6,7 +6,6 @@ echo.
 echo Virtual Environment: CREATED ✓
 echo Dependencies: INSTALLED ✓  
 echo SpaCy Model: DOWNLOADED ✓
-echo NLTK Data: DOWNLOADED ✓
 echo.
 echo ========================================
 echo  HOW TO RUN THE SYSTEM
@@ -18,6 +18,9 @@ try:
     # Initialize system
     print("Initializing system...")
     system = GeospatialQuerySystem()
+    
+    # The system loads lazily, so load the data now to report problems here
+    system.setup()
     print("✅ System initialized successfully!")
     
     # Test queries
@@ -31,12 +34,20 @@ try:
     print("\n🧪 RUNNING TEST QUERIES")
     print("=" * 30)
     
-    for i, query in enumerate(test_queries, 1):
+    # Extract and match all queries as one batch; if the batch fails, rerun
+    # the queries one at a time so each error is reported against its query
+    try:
+        all_results = system.process_queries(test_queries)
+    except Exception:
+        all_results = [None] * len(test_queries)
+    
+    for i, (query, results) in enumerate(zip(test_queries, all_results), 1):
         print(f"\n{i}. Query: {query}")
         print("   Results:")
         
         try:
-            results = system.process_query(query)
+            if results is None:
+                results = system.process_query(query)
             if results:
                 for result in results:
                     print(f"   • {result['token']} → {result['canonical_name']} ({result['table']})")
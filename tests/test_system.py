@@ -3,16 +3,19 @@ Test file for the Geospatial NLP Query System
 """
 
 import unittest
+from unittest import mock
 import sys
 import os
 
-# Add src directory to path
+# Add src directory (and the repository root, for demo.py) to path
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 
 from data_processor import DataProcessor
 from nlp_processor import NLPProcessor
 from fuzzy_matcher import FuzzyMatcher
 from geospatial_query_system import GeospatialQuerySystem
+import demo
 
 
 class TestDataProcessor(unittest.TestCase):
@@ -46,6 +49,30 @@ class TestDataProcessor(unittest.TestCase):
             self.assertGreater(len(canonical_data['countries']), 0)
         except FileNotFoundError:
             self.skipTest("worldcities.csv not found - test requires data file")
+    
+    def test_canonical_mappings_cached_until_reload(self):
+        """Test mappings are built once and rebuilt after reloading data"""
+        try:
+            mappings = self.processor.get_canonical_mappings()
+            self.assertIs(self.processor.get_canonical_mappings(), mappings)
+            
+            self.processor.load_worldcities_data()
+            self.assertIsNot(self.processor.get_canonical_mappings(), mappings)
+            self.assertEqual(self.processor.get_canonical_mappings(), mappings)
+        except FileNotFoundError:
+            self.skipTest("worldcities.csv not found - test requires data file")
+    
+    def test_streamed_mappings_match_full_load(self):
+        """Test chunked streaming yields the same mappings and stats as a full load"""
+        try:
+            streamed = DataProcessor(self.processor.data_path, chunksize=5000)
+            mappings = streamed.stream_worldcities_data()
+            self.assertIsNone(streamed.cities_df)
+            
+            self.assertEqual(mappings, self.processor.get_canonical_mappings())
+            self.assertEqual(streamed.get_data_stats(), self.processor.get_data_stats())
+        except FileNotFoundError:
+            self.skipTest("worldcities.csv not found - test requires data file")
 
 
 class TestNLPProcessor(unittest.TestCase):
@@ -64,6 +91,17 @@ class TestNLPProcessor(unittest.TestCase):
         self.assertIn('Ahmedabad', words)
         self.assertIn('New-Zealand', words)
     
+    def test_extract_capitalized_words_long_text(self):
+        """Test long texts (scanned by the Numba kernel when installed) give the regex results"""
+        text = "Rainfall in Ahmedabad, New-Zealand and Delhi-\nNCR on Monday. "
+        words = self.nlp_processor.extract_capitalized_words(text)
+        
+        self.assertEqual(self.nlp_processor.extract_capitalized_words(text * 40), words * 40)
+    
+    def test_model_shared_between_instances(self):
+        """Test the spaCy pipeline is loaded once and reused"""
+        self.assertIs(NLPProcessor().nlp, self.nlp_processor.nlp)
+    
     def test_preprocess_text(self):
         """Test text preprocessing"""
         text = "Show me data for New-Zealand and U.S.A."
@@ -80,6 +118,48 @@ class TestNLPProcessor(unittest.TestCase):
         # Should extract Mumbai and Delhi
         place_text = ' '.join(places).lower()
         self.assertTrue('mumbai' in place_text or 'delhi' in place_text)
+    
+    def test_gazetteer_mode(self):
+        """Test gazetteer mode skips the spaCy model and rejects unknown modes"""
+        processor = NLPProcessor(mode='gazetteer')
+        self.assertIsNone(processor.nlp)
+        self.assertEqual(processor.extract_potential_places_spacy("Rainfall in Delhi"), [])
+        
+        processor.load_gazetteer(['Delhi'])
+        self.assertEqual(processor.extract_all_potential_places("Rainfall in Delhi"), ['Delhi'])
+        
+        with self.assertRaises(ValueError):
+            NLPProcessor(mode='fast')
+    
+    def test_extraction_preprocesses_text(self):
+        """Test extraction applies preprocessing unless told the text is already clean"""
+        places = self.nlp_processor.extract_all_potential_places("Flights   to New-Zealand")
+        self.assertIn('New Zealand', places)
+        
+        places = self.nlp_processor.extract_all_potential_places("Flights to New-Zealand", preprocess=False)
+        self.assertIn('New-Zealand', places)
+    
+    def test_extraction_cache(self):
+        """Test repeated texts are extracted once and returned as independent lists"""
+        first = self.nlp_processor.extract_all_potential_places("Weather in Mumbai")
+        first.append('Modified')
+        second = self.nlp_processor.extract_all_potential_places("Weather in Mumbai")
+        
+        self.assertEqual(self.nlp_processor._cached_extract_places.cache_info().hits, 1)
+        self.assertNotIn('Modified', second)
+        
+        # Loading a gazetteer changes the results, so it must not reuse cached ones
+        self.nlp_processor.load_gazetteer(['Mumbai'])
+        self.assertEqual(self.nlp_processor._cached_extract_places.cache_info().currsize, 0)
+    
+    def test_gazetteer_matches(self):
+        """Test known names are matched exactly and cover the capitalized phrases around them"""
+        self.nlp_processor.load_gazetteer(['New York', 'Delhi', 'York'])
+        
+        self.assertEqual(self.nlp_processor.extract_gazetteer_matches("Compare New York and Delhi"),
+                         ['New York', 'Delhi'])
+        self.assertEqual(self.nlp_processor.extract_all_potential_places("Compare New York and Delhi"),
+                         ['New York', 'Delhi'])
 
 
 class TestFuzzyMatcher(unittest.TestCase):
@@ -133,6 +213,65 @@ class TestFuzzyMatcher(unittest.TestCase):
         self.assertIsNotNone(result)
         self.assertEqual(result['canonical_name'], 'Delhi')
         self.assertEqual(result['table'], 'City')
+    
+    def test_exact_match_prefilter(self):
+        """Test exact names skip fuzzy scoring"""
+        result = self.matcher.find_best_match('Tamil Nadu!', self.matcher.states_lookup,
+                                              self.matcher.states_originals, self.matcher.states_exact)
+        self.assertEqual(result, ('Tamil Nadu', 100.0, 'exact'))
+    
+    def test_exact_match_punctuated_name(self):
+        """Test names with punctuation normalize like queries and resolve exactly"""
+        matcher = FuzzyMatcher({'cities': {"xi'an": "Xi'an", 'st. louis': 'St. Louis'}}, threshold=90)
+        
+        self.assertEqual(matcher.match_to_cities("Xi'an"), ("Xi'an", 100.0, 'City'))
+        self.assertEqual(matcher.get_best_match('St. Louis')['match_algorithm'], 'exact')
+    
+    def test_match_query_cache(self):
+        """Test that repeated tokens are served from the cache as independent copies"""
+        first = self.matcher.match_query('mumbay')
+        first[0]['canonical_name'] = 'Modified'
+        second = self.matcher.match_query('mumbay')
+        
+        self.assertEqual(self.matcher._cached_match_query.cache_info().hits, 1)
+        self.assertEqual(second[0]['canonical_name'], 'Mumbai')
+        
+        # A threshold change must not reuse results scored under the old one
+        self.matcher.threshold = 100
+        self.assertEqual(self.matcher.match_query('mumbay'), [])
+    
+    def test_batch_match(self):
+        """Test batch matching agrees with single matching"""
+        queries = ['mumbay', 'chennai', 'xyzzy']
+        lookup = (self.matcher.cities_lookup, self.matcher.cities_originals, self.matcher.cities_exact)
+        results = self.matcher.batch_match(queries, *lookup)
+        self.assertEqual(len(results), 3)
+        for query, result in zip(queries, results):
+            self.assertEqual(result, self.matcher.find_best_match(query, *lookup))
+        self.assertIsNone(results[2])
+        self.assertEqual(results[1][2], 'exact')
+    
+    def test_match_queries_batch(self):
+        """Test pooled batch matching agrees with per-table matching"""
+        queries = ['deli', 'new zealand', 'tamil nadu', 'xyzzy']
+        results = self.matcher.match_queries_batch(queries)
+        for query, matches in zip(queries, results):
+            expected = [self.matcher.match_to_cities(query), self.matcher.match_to_countries(query),
+                        self.matcher.match_to_states(query)]
+            self.assertCountEqual(
+                [(m['canonical_name'], m['confidence_score'], m['table']) for m in matches],
+                [match for match in expected if match])
+        self.assertEqual(results[3], [])
+    
+    def test_match_queries_batch_exact_first(self):
+        """Test exact names skip fuzzy scoring of the other tables when asked to"""
+        matcher = FuzzyMatcher({'cities': {'new delhi': 'New Delhi'}, 'countries': {},
+                                'states': {'delhi': 'Delhi'}}, threshold=70)
+        
+        self.assertEqual(len(matcher.match_queries_batch(['delhi'])[0]), 2)
+        
+        matches = matcher.match_queries_batch(['delhi'], exact_first=True)[0]
+        self.assertEqual([(m['canonical_name'], m['table']) for m in matches], [('Delhi', 'State')])
 
 
 class TestGeospatialQuerySystem(unittest.TestCase):
@@ -143,6 +282,7 @@ class TestGeospatialQuerySystem(unittest.TestCase):
         try:
             # Try to initialize with real data
             self.system = GeospatialQuerySystem()
+            self.system.setup()
         except Exception:
             # If real data not available, skip these tests
             self.system = None
@@ -156,6 +296,18 @@ class TestGeospatialQuerySystem(unittest.TestCase):
         self.assertIsNotNone(self.system.nlp_processor)
         self.assertIsNotNone(self.system.fuzzy_matcher)
     
+    def test_lazy_initialization(self):
+        """Test that data and models load on first use"""
+        system = GeospatialQuerySystem()
+        self.assertIsNone(system._fuzzy_matcher)
+        self.assertIsNone(system._nlp_processor)
+        
+        if self.system is None:
+            self.skipTest("System requires worldcities.csv data file")
+        
+        self.assertIsNotNone(system.fuzzy_matcher)
+        self.assertIsNotNone(system.nlp_processor)
+    
     def test_process_simple_query(self):
         """Test processing a simple query"""
         if self.system is None:
@@ -187,6 +339,161 @@ class TestGeospatialQuerySystem(unittest.TestCase):
         
         # Should find some geographical entities
         self.assertTrue(len(found_entities) > 0)
+    
+    def test_process_query_cache(self):
+        """Test that repeated queries return equal but independent results"""
+        if self.system is None:
+            self.skipTest("System requires worldcities.csv data file")
+        
+        query = "What is the weather in Mumbai?"
+        first = self.system.process_query(query)
+        first[0]['canonical_name'] = 'Modified'
+        second = self.system.process_query(query)
+        
+        self.assertEqual(self.system._cached_process_query.cache_info().hits, 1)
+        self.assertNotEqual(second[0]['canonical_name'], 'Modified')
+    
+    def test_process_query_detailed_cache_isolated(self):
+        """Test that mutating detailed results does not leak into later cache hits"""
+        if self.system is None:
+            self.skipTest("System requires worldcities.csv data file")
+        
+        query = "What is the weather in Mumbai?"
+        first = self.system.process_query(query, detailed=True)
+        self.assertGreater(len(first), 0)
+        expected_score = first[0]['confidence_score']
+        first[0]['all_matches'][0]['confidence_score'] = -1
+        first[0]['all_matches'].clear()
+        
+        second = self.system.process_query(query, detailed=True)
+        self.assertEqual(second[0]['confidence_score'], expected_score)
+        self.assertGreater(len(second[0]['all_matches']), 0)
+    
+    def test_process_query_threshold_argument(self):
+        """Test a per-query threshold is used for matching without touching the shared matcher"""
+        if self.system is None:
+            self.skipTest("System requires worldcities.csv data file")
+        
+        query = "Rainfall in Mumbay"
+        self.assertEqual(self.system.process_query(query, threshold=100), [])
+        self.assertEqual(self.system.fuzzy_matcher.threshold, 80)
+        self.assertTrue(self.system.process_query(query))
+    
+    def test_process_queries_batch(self):
+        """Test batch processing returns the same results as one query at a time"""
+        if self.system is None:
+            self.skipTest("System requires worldcities.csv data file")
+        
+        queries = ["Compare Mumbai and Delhi", "No places here", "Weather in New-Zealand"]
+        results = self.system.process_queries(queries)
+        
+        self.assertEqual(results, [self.system.process_query(query) for query in queries])
+
+
+class TestDemoFuzzyMatcher(unittest.TestCase):
+    """Test cases for the demo's fallback fuzzy matcher (used without rapidfuzz)"""
+    
+    @staticmethod
+    def reference_similarity(s1, s2):
+        """The original set-based scorer the fallback paths must reproduce"""
+        s1, s2 = s1.lower(), s2.lower()
+        if s1 == s2:
+            return 100.0
+        max_len = max(len(s1), len(s2))
+        if max_len == 0:
+            return 0.0
+        chars1, chars2 = set(s1), set(s2)
+        char_score = (len(chars1 & chars2) / len(chars1 | chars2)) * 100
+        length_penalty = (abs(len(s1) - len(s2)) / max_len) * 20
+        return max(0, char_score - length_penalty)
+    
+    def reference_best_match(self, query, candidates, threshold):
+        """First highest scoring candidate at or above the threshold, as (candidate, score, index)"""
+        best_match = None
+        for index, candidate in enumerate(candidates):
+            score = self.reference_similarity(query, candidate)
+            if score >= threshold and score > 0 and (best_match is None or score > best_match[1]):
+                best_match = (candidate, score, index)
+        return best_match
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.demo = demo.SimpleGeoDemo()
+        self.candidates = self.demo._all_candidates
+        
+        # Misspelled, truncated and punctuated variants of every candidate
+        self.queries = ['a.b', 'Mumbai!', 'new-york', 'st. louis', 'x']
+        for candidate in self.candidates:
+            self.queries.append(candidate.upper())
+            self.queries.append(candidate[1:])
+            self.queries.append(candidate[:-1] + '.')
+            self.queries.append(candidate[::-1])
+    
+    def assertMatchesReference(self, query, result, threshold):
+        """Assert a fallback result equals the reference scorer's result"""
+        expected = self.reference_best_match(query, self.candidates, threshold)
+        if expected is None:
+            self.assertIsNone(result)
+        else:
+            self.assertIsNotNone(result)
+            self.assertEqual(result[0], expected[0])
+            self.assertEqual(result[2], expected[2])
+            self.assertAlmostEqual(result[1], expected[1])
+    
+    def test_similarity_matches_reference(self):
+        """Test the bitmask scorer against the set-based scorer"""
+        self.assertEqual(demo.SimpleFuzzyMatcher.similarity('a.b', 'a,b'), 50.0)
+        for query in self.queries:
+            for candidate in self.candidates[:10]:
+                with self.subTest(query=query, candidate=candidate):
+                    self.assertAlmostEqual(demo.SimpleFuzzyMatcher.similarity(query, candidate),
+                                           self.reference_similarity(query, candidate))
+    
+    def test_fallback_paths_match_reference(self):
+        """Test the pure Python, NumPy and Numba paths against the set-based scorer"""
+        candidate_lens = [len(candidate) for candidate in self.candidates]
+        candidate_bits = [demo._to_bits(candidate) for candidate in self.candidates]
+        buckets = demo.SimpleFuzzyMatcher.length_buckets(candidate_lens)
+        
+        paths = {
+            'pure': dict(),
+            'pure-precomputed': dict(candidate_bits=candidate_bits, candidate_lens=candidate_lens,
+                                     length_buckets=buckets),
+        }
+        if demo.np is not None:
+            array_bits = demo.np.array([demo._split_bits(bits) for bits in candidate_bits],
+                                       dtype=demo.np.uint64)
+            array_lens = demo.np.array(candidate_lens, dtype=demo.np.int64)
+            paths['numpy'] = dict(candidate_bits=array_bits, candidate_lens=array_lens)
+            if demo._load_numba_kernel() is not None:
+                paths['numba'] = dict(candidate_bits=array_bits, candidate_lens=array_lens)
+        
+        with mock.patch.object(demo, 'process', None):
+            for name, kwargs in paths.items():
+                kernel = demo._load_numba_kernel() if name == 'numba' else None
+                with mock.patch.object(demo, '_load_numba_kernel', return_value=kernel):
+                    for threshold in (0, 70, 90):
+                        for query in self.queries:
+                            with self.subTest(path=name, threshold=threshold, query=query):
+                                result = demo.SimpleFuzzyMatcher.find_best_match(
+                                    query, self.candidates, threshold, **kwargs)
+                                self.assertMatchesReference(query, result, threshold)
+    
+    def test_single_and_batch_scores_agree(self):
+        """Test a token scores the same whether matched alone or in a batch"""
+        for token in ['Delhi_', 'New--Zealand', 'Tamil_Nadu', 'Mumbay', 'MUMBAI']:
+            with self.subTest(token=token):
+                self.assertEqual(self.demo.match_entity(token), self.demo.match_entities([token]))
+    
+    def test_demo_without_rapidfuzz(self):
+        """Test the demo matches typos through its precomputed fallback data"""
+        with mock.patch.object(demo, 'process', None):
+            match = demo.SimpleFuzzyMatcher.find_best_match(
+                'bangalor', self.candidates, self.demo.match_threshold,
+                candidate_bits=self.demo._all_bits, candidate_lens=self.demo._all_lens,
+                length_buckets=self.demo._length_buckets)
+        self.assertIsNotNone(match)
+        self.assertEqual(match[0], 'bangalore')
 
 
 def run_tests():
@@ -203,6 +510,7 @@ def run_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestNLPProcessor))
     suite.addTests(loader.loadTestsFromTestCase(TestFuzzyMatcher))
     suite.addTests(loader.loadTestsFromTestCase(TestGeospatialQuerySystem))
+    suite.addTests(loader.loadTestsFromTestCase(TestDemoFuzzyMatcher))
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)